@@ -1,3 +1,14 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Announcement
+
+
+class AnnouncementAdmin(admin.ModelAdmin):
+    list_display = [
+        "message",
+        "level",
+        "active",
+        "created_on",
+    ]
+
+admin.site.register(Announcement, AnnouncementAdmin)
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class BaseConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "base"
+
+    def ready(self):
+        from .models import Announcement, invalidate_announcements
+        from .profiling import install_query_profiler
+
+        connection_created.connect(install_query_profiler, dispatch_uid="base.profiling")
+        post_save.connect(invalidate_announcements, sender=Announcement, dispatch_uid="base.announcements")
+        post_delete.connect(invalidate_announcements, sender=Announcement, dispatch_uid="base.announcements")
@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from .models import active_announcements
+
+
+def announcements(request):
+    # Site-wide notices for base.html, looked up lazily from the cache
+    return {"announcements": SimpleLazyObject(active_announcements)}
@@ -0,0 +1,128 @@
+import http.client
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from .benchmark_servers import HEADERS, free_port, get
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure time-to-first-byte after a restart, for the old `migrate && gunicorn` start and for the `boot` "
+        "command, against a throwaway seeded SQLite database that is already migrated. Reports the time from "
+        "starting the process to the first byte of the first response, and each view's first and second response "
+        "times, as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", default="migrate,boot", help="Comma separated start modes to benchmark")
+        parser.add_argument("--runs", type=int, default=5, help="Restarts measured per mode, reporting the median")
+        parser.add_argument("--workers", type=int, default=1, help="gunicorn worker processes")
+        parser.add_argument("--events", type=int, default=100, help="Number of events to seed")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        modes = options["modes"].split(",")
+        for mode in modes:
+            if mode not in ("migrate", "boot"):
+                raise CommandError(f"Unknown mode {mode!r}, expected migrate or boot")
+
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'benchmark.sqlite3')}",
+                "DEBUG": "False",
+                "PROFILING_SAMPLE_RATE": "0",
+                "PAGE_CACHE_TIMEOUT": "0",
+            }
+            self.manage(env, "migrate", "--no-input")
+            self.manage(env, "seed_data", f"--events={options['events']}", "--users=20", "--seed=1")
+
+            results = []
+            for mode in modes:
+                runs = [self.restart(mode, env, options) for _ in range(options["runs"])]
+                results.append({"mode": mode, **{key: statistics.median(run[key] for run in runs) for key in runs[0]}})
+
+        report = json.dumps({
+            "runs": options["runs"],
+            "workers": options["workers"],
+            "results": results,
+        }, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(report + "\n")
+        else:
+            self.stdout.write(report)
+
+    def manage(self, env, *args):
+        subprocess.run(
+            [sys.executable, "manage.py", *args], cwd=settings.BASE_DIR, env=env, check=True, capture_output=True
+        )
+
+    def start_command(self, mode, port, options):
+        gunicorn = [f"--bind=127.0.0.1:{port}", f"--workers={options['workers']}"]
+        if mode == "migrate":
+            # The Procfile before the boot command, without the warm-up it now gets from projectCTW.wsgi
+            return ["sh", "-c", f"{sys.executable} manage.py migrate && gunicorn projectCTW.wsgi {' '.join(gunicorn)}"]
+        return [sys.executable, "manage.py", "boot", "--", *gunicorn]
+
+    def restart(self, mode, env, options):
+        port = free_port()
+        env = {**env, "WARM_UP": str(mode == "boot")}
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            self.start_command(mode, port, options),
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            proposals = first_response(port, "/events/", start)
+            result = {"ttfb_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+            detail = re.search(r"/events/detail/[0-9a-f-]{36}/", proposals).group(0)
+            for name, path in (("detailView", detail), ("login", "/accounts/login/"), ("about", "/about/")):
+                result[f"{name}_first_ms"] = time_to_first_byte(port, path)
+                result[f"{name}_second_ms"] = time_to_first_byte(port, path)
+            return result
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def time_to_first_byte(port, path):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        start = time.perf_counter()
+        connection.request("GET", path, headers=HEADERS)
+        response = connection.getresponse()
+        elapsed = time.perf_counter() - start
+        if response.status != 200:
+            raise CommandError(f"{path} returned {response.status}")
+        response.read()
+        return round(elapsed * 1000, 1)
+    finally:
+        connection.close()
+
+
+def first_response(port, path, start, timeout=60):
+    # Polls far more often than benchmark_servers.wait_for_server, as the time it takes is what's being measured
+    while True:
+        try:
+            status, body = get(port, path)
+            if status == 200:
+                return body
+        except OSError:
+            pass
+        if time.perf_counter() - start > timeout:
+            raise CommandError(f"Server on port {port} did not start within {timeout}s")
+        time.sleep(0.005)
@@ -0,0 +1,166 @@
+import http.client
+import json
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Sent with every request so production settings (no DEBUG, SSL redirect, allowed hosts) serve the page directly
+HEADERS = {"Host": "projectctw.com", "X-Forwarded-Proto": "https"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent-request throughput of the gunicorn WSGI and uvicorn ASGI serving modes on the main "
+        "read views, against a throwaway seeded SQLite database, and report requests/s and p50/p95 latency as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", default="wsgi,asgi", help="Comma separated serving modes to benchmark")
+        parser.add_argument("--events", type=int, default=500, help="Number of events to seed")
+        parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+        parser.add_argument("--requests", type=int, default=500, help="Requests sent per view and mode")
+        parser.add_argument("--workers", type=int, default=2, help="Server worker processes in both modes")
+        parser.add_argument("--threads", type=int, default=4, help="Threads per gunicorn worker in WSGI mode")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        modes = options["modes"].split(",")
+        for mode in modes:
+            if mode not in ("wsgi", "asgi"):
+                raise CommandError(f"Unknown mode {mode!r}, expected wsgi or asgi")
+            if not shutil.which(self.server_command(mode, 0, options)[0]):
+                raise CommandError(f"{self.server_command(mode, 0, options)[0]} is not installed")
+
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'benchmark.sqlite3')}",
+                "DEBUG": "False",
+                "PROFILING_SAMPLE_RATE": "0",
+                # Measure rendering, not anonymous page cache hits
+                "PAGE_CACHE_TIMEOUT": "0",
+            }
+            self.manage(env, "migrate", "--no-input")
+            self.manage(env, "seed_data", f"--events={options['events']}", f"--users={max(options['events'] // 5, 20)}", "--seed=1")
+
+            results = []
+            for mode in modes:
+                results += self.benchmark_mode(mode, env, options)
+
+        report = json.dumps({
+            "concurrency": options["concurrency"],
+            "requests": options["requests"],
+            "workers": options["workers"],
+            "threads": options["threads"],
+            "events": options["events"],
+            "results": results,
+        }, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(report + "\n")
+        else:
+            self.stdout.write(report)
+
+    def manage(self, env, *args):
+        subprocess.run(
+            [sys.executable, "manage.py", *args], cwd=settings.BASE_DIR, env=env, check=True, capture_output=True
+        )
+
+    def server_command(self, mode, port, options):
+        if mode == "wsgi":
+            return [
+                "gunicorn", "projectCTW.wsgi",
+                f"--bind=127.0.0.1:{port}", f"--workers={options['workers']}", f"--threads={options['threads']}",
+            ]
+        return [
+            "uvicorn", "projectCTW.asgi:application",
+            "--host=127.0.0.1", f"--port={port}", f"--workers={options['workers']}", "--log-level=warning",
+        ]
+
+    def benchmark_mode(self, mode, env, options):
+        port = free_port()
+        env = {**env, "ASYNC_VIEWS": str(mode == "asgi")}
+        server = subprocess.Popen(
+            self.server_command(mode, port, options),
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            proposals = wait_for_server(port, "/events/")
+            detail = "/events/detail/{}/".format(re.search(r"/events/detail/([0-9a-f-]{36})/", proposals).group(1))
+            profile = re.search(r"/account/profile/[^/\"]+/", get(port, detail)[1])
+
+            paths = {"proposedEvents": "/events/", "detailView": detail}
+            if profile:
+                paths["UserProfileView"] = profile.group(0)
+            return [self.load(mode, name, port, path, options) for name, path in paths.items()]
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    def load(self, mode, name, port, path, options):
+        def timed_get(_):
+            start = time.perf_counter()
+            status, _ = get(port, path)
+            return status, (time.perf_counter() - start) * 1000
+
+        # Warm up each worker's connections and caches before measuring
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            list(executor.map(timed_get, range(options["concurrency"])))
+
+            start = time.perf_counter()
+            responses = list(executor.map(timed_get, range(options["requests"])))
+            elapsed = time.perf_counter() - start
+
+        timings = sorted(duration for _, duration in responses)
+        return {
+            "mode": mode,
+            "view": name,
+            "requests_per_second": round(len(responses) / elapsed, 1),
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[round(0.95 * (len(timings) - 1))], 3),
+            "errors": sum(1 for status, _ in responses if status != 200),
+        }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(port, path):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        connection.request("GET", path, headers=HEADERS)
+        response = connection.getresponse()
+        return response.status, response.read().decode()
+    finally:
+        connection.close()
+
+
+def wait_for_server(port, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            status, body = get(port, path)
+            if status == 200:
+                return body
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            raise CommandError(f"Server on port {port} did not start within {timeout}s")
+        time.sleep(0.2)
@@ -0,0 +1,109 @@
+import json
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.utils import EngineHandler
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from events.models import Event
+from events.pagination import KeysetPage
+
+
+# The proposals feed cards, rendered as the infinite scroll returns them
+TEMPLATE = "events/partials/event_cards.html"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering the proposals event cards with the Django and Jinja2 template engines, from in-memory "
+        "events, and report the time per render and per card as JSON. The Django engine is timed with its "
+        "{% cache %} card fragments all cached and with fragment caching off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="24,100,500", help="Comma separated numbers of cards per render")
+        parser.add_argument("--repeat", type=int, default=50, help="Renders timed per engine and size")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        jinja2 = EngineHandler([settings.JINJA2_BACKEND])["jinja2"]
+        modes = [
+            ("django", "cached", engines["django"]),
+            ("django", "off", engines["django"]),
+            ("jinja2", None, jinja2),
+        ]
+
+        results = []
+        for size in sizes:
+            events = make_events(size)
+            for engine_name, fragment_cache, engine in modes:
+                # Never touch the real cache: a private one big enough for every card, or none at all
+                cache = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+                if fragment_cache == "cached":
+                    cache = {
+                        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                        "LOCATION": "benchmark_templates",
+                        "OPTIONS": {"MAX_ENTRIES": size + 1},
+                    }
+                with override_settings(CACHES={"default": cache}):
+                    timings = self.time_renders(engine, events, options["repeat"])
+                    caches["default"].clear()
+
+                render_ms = statistics.median(timings)
+                results.append({
+                    "engine": engine_name,
+                    "fragment_cache": fragment_cache,
+                    "cards": size,
+                    "render_ms": round(render_ms, 3),
+                    "per_card_us": round(render_ms * 1000 / size, 1),
+                })
+
+        report = json.dumps({"repeat": options["repeat"], "results": results}, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(report + "\n")
+        else:
+            self.stdout.write(report)
+
+    def time_renders(self, engine, events, repeat):
+        template = engine.get_template(TEMPLATE)
+        request = RequestFactory().get("/events/")
+        request.user = AnonymousUser()
+        context = {"events": events, "page_obj": KeysetPage(events, "next"), "feed_query": ""}
+
+        # The first render compiles the template and fills the fragment cache
+        template.render(dict(context), request)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            template.render(dict(context), request)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+
+def make_events(size):
+    now = timezone.now()
+    statuses = Event.StatusCode.values
+    events = []
+    for i in range(size):
+        event = Event(
+            id=uuid.uuid4(),
+            name=f"Event {i}",
+            description="A community event that people can vote for and help plan. " * 3,
+            location="the web",
+            status=statuses[i % len(statuses)],
+            upvote_count=i,
+            updated_on=now,
+        )
+        # As annotated by Event.objects.for_viewer()
+        event.viewer_upvoted = i % 3 == 0
+        events.append(event)
+    return events
@@ -0,0 +1,97 @@
+import json
+import statistics
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main views against seeded datasets of several sizes in a throwaway test database and "
+        "report p50/p95 latency, SQL query count and response size as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="100,1000",
+            help="Comma separated numbers of events to seed, one benchmark round per size",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Requests timed per view and size")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+
+        # Never seed the real database: run everything against a test database that is dropped afterwards
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = []
+            for size in sizes:
+                results += self.benchmark_size(size, options["repeat"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = json.dumps({"repeat": options["repeat"], "results": results}, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(report + "\n")
+        else:
+            self.stdout.write(report)
+
+    def benchmark_size(self, size, repeat):
+        call_command("flush", "--no-input", verbosity=0)
+        for cache in caches.all():
+            cache.clear()
+        call_command("seed_data", events=size, users=max(size // 5, 20), seed=size, stdout=StringIO())
+
+        # The busiest event and one of its voters make the worst case for the detail and upvote views
+        event = Event.objects.order_by("-comment_count", "-upvote_count").first()
+        user = get_user_model().objects.filter(up_votes__isnull=False).first()
+
+        client = Client()
+        client.force_login(user)
+
+        views = {
+            "proposedEvents": lambda: client.get(reverse("proposals"), secure=True),
+            "detailView": lambda: client.get(event.get_absolute_url(), secure=True),
+            "upvoteEvent": lambda: client.post(reverse("upvote", kwargs={"pk": event.pk}), secure=True),
+            "UserProfileView": lambda: client.get(
+                reverse("user_profile", kwargs={"slug": user.username}), secure=True
+            ),
+        }
+        return [self.benchmark_view(name, request, size, repeat) for name, request in views.items()]
+
+    def benchmark_view(self, name, request, size, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - start) * 1000)
+
+        # Nearest-rank percentiles, so a single repeat still reports something
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[round(0.95 * (len(timings) - 1))]
+        return {
+            "view": name,
+            "size": size,
+            "status": response.status_code,
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(p95, 3),
+            "queries": len(queries),
+            "bytes": len(response.content),
+        }
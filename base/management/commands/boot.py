@@ -0,0 +1,74 @@
+import time
+from contextlib import contextmanager
+
+from django.core import management
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import get_internal_wsgi_application
+from django.db import connections
+from gunicorn.app.base import BaseApplication
+
+from base.warmup import pending_migrations
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the web server. Migrates only if migrations are pending, loads and warms up the application, then "
+        "serves it with gunicorn, forking the workers from the warmed up process. Arguments after -- are passed "
+        "to gunicorn."
+    )
+    # Checked in CI, not on every restart
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("gunicorn_args", nargs="*", help="gunicorn options, after --")
+
+    def handle(self, *args, **options):
+        with self.phase("migration check") as notes:
+            plan = pending_migrations()
+            notes.append(f"{len(plan)} pending")
+        if plan:
+            with self.phase("migrate"):
+                management.call_command("migrate", interactive=False, verbosity=0)
+        # Workers must open their own connections rather than share this one across the fork
+        connections.close_all()
+
+        with self.phase("load and warm up"):
+            application = get_internal_wsgi_application()
+
+        self.serve(application, options["gunicorn_args"])
+
+    def serve(self, application, argv):
+        GunicornApplication(application, argv).run()
+
+    @contextmanager
+    def phase(self, name):
+        notes = []
+        start = time.perf_counter()
+        yield notes
+        details = "".join(f", {note}" for note in notes)
+        self.stdout.write(f"{name}: {time.perf_counter() - start:.2f}s{details}")
+        self.stdout.flush()
+
+
+class GunicornApplication(BaseApplication):
+    """
+        gunicorn serving an application already loaded in this process, configured from GUNICORN_CMD_ARGS and then
+        argv like the gunicorn command itself.
+    """
+
+    def __init__(self, application, argv):
+        self.application = application
+        self.argv = argv
+        super().__init__(prog="manage.py boot")
+
+    def load_config(self):
+        parser = self.cfg.parser()
+        for args in (parser.parse_args(self.cfg.get_cmd_args_from_env()), parser.parse_args(self.argv)):
+            for name, value in vars(args).items():
+                if value is not None and name != "args":
+                    self.cfg.set(name.lower(), value)
+        # The workers are forked from this process with the application already loaded
+        self.cfg.set("preload_app", True)
+
+    def load(self):
+        return self.application
@@ -0,0 +1,137 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Comment, Event, Plan, ProposedDate, Upvote, Volunteer
+
+
+class Command(BaseCommand):
+    help = "Seed the database with synthetic users, events, upvotes, comments, plans and proposed dates for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200, help="Number of users to create")
+        parser.add_argument("--events", type=int, default=1000, help="Number of events to create")
+        parser.add_argument("--max-upvotes", type=int, default=25, help="Most upvotes a single event receives")
+        parser.add_argument("--max-comments", type=int, default=10, help="Most comments a single event receives")
+        parser.add_argument(
+            "--plan-ratio",
+            type=float,
+            default=0.1,
+            help="Fraction of events that are past the proposal stage and get a plan with proposed dates",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Events written per bulk_create batch")
+        parser.add_argument("--seed", type=int, help="Random seed, for reproducible datasets")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.now = timezone.now()
+        batch_size = options["batch_size"]
+
+        # Every run gets its own prefix so seeding twice never collides on the unique username/email columns
+        prefix = f"seed-{uuid.uuid4().hex[:8]}"
+        users = self.create_users(prefix, options["users"], batch_size)
+        user_ids = [user.pk for user in users]
+
+        num_events = options["events"]
+        for start in range(0, num_events, batch_size):
+            with transaction.atomic():
+                self.create_events(
+                    prefix,
+                    range(start, min(start + batch_size, num_events)),
+                    user_ids,
+                    options,
+                )
+
+        # bulk_create skips Event.save(), so score the new events in one pass
+        call_command("update_trending", stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded {len(users)} user(s) and {num_events} event(s) as {prefix}."))
+
+    def create_users(self, prefix, num_users, batch_size):
+        # Hashing is deliberately slow, so every seeded user shares one hash
+        password = make_password("seedpass123")
+        users = [
+            get_user_model()(
+                username=f"{prefix}-user{i}",
+                email=f"{prefix}-user{i}@example.com",
+                password=password,
+                bio="Seeded user",
+            )
+            for i in range(num_users)
+        ]
+        return get_user_model().objects.bulk_create(users, batch_size=batch_size)
+
+    def random_time(self, days=30):
+        return self.now - timedelta(seconds=self.rng.randint(0, days * 24 * 60 * 60))
+
+    def create_events(self, prefix, indexes, user_ids, options):
+        rng = self.rng
+        events, upvotes, comments = [], [], []
+        planned_events = []
+
+        for i in indexes:
+            voters = rng.sample(user_ids, rng.randint(0, min(options["max_upvotes"], len(user_ids))))
+            num_comments = rng.randint(0, options["max_comments"])
+            planned = rng.random() < options["plan_ratio"]
+
+            event = Event(
+                name=f"{prefix} event {i}",
+                description=f"Synthetic event {i} for load testing. " * rng.randint(1, 5),
+                location=rng.choice(["Downtown", "Memorial Park", "Riverside", "Old Town", "Library"]),
+                created_by_id=rng.choice(user_ids),
+                upvote_count=len(voters),
+                comment_count=num_comments,
+                status=Event.StatusCode.PLANNING if planned else Event.StatusCode.PROPOSAL,
+            )
+            events.append(event)
+            if planned:
+                planned_events.append(event)
+
+            upvotes += [Upvote(event=event, user_id=user_id, created_on=self.random_time()) for user_id in voters]
+            comments += [
+                Comment(event=event, created_by_id=rng.choice(user_ids), comment=f"Seeded comment {n} on event {i}")
+                for n in range(num_comments)
+            ]
+
+        Event.objects.bulk_create(events)
+        Upvote.objects.bulk_create(upvotes)
+        Comment.objects.bulk_create(comments)
+        self.create_plans(planned_events, user_ids)
+
+    def create_plans(self, events, user_ids):
+        rng = self.rng
+        plans = [Plan(event=event) for event in events]
+        DateVote = ProposedDate.votes.through
+        volunteers, dates, date_votes = [], [], []
+
+        for plan in plans:
+            plan_volunteers = [
+                Volunteer(plan_id=plan.pk, user_id=user_id, created_on=self.random_time())
+                for user_id in rng.sample(user_ids, rng.randint(0, min(10, len(user_ids))))
+            ]
+            plan.volunteer_count = len(plan_volunteers)
+            volunteers += plan_volunteers
+            for _ in range(rng.randint(1, 3)):
+                proposed_date = ProposedDate(
+                    for_plan=plan,
+                    created_by_id=rng.choice(user_ids),
+                    date=(self.now + timedelta(days=rng.randint(7, 60))).date(),
+                )
+                dates.append(proposed_date)
+                date_votes += [
+                    DateVote(proposeddate_id=proposed_date.pk, user_id=user_id)
+                    for user_id in rng.sample(user_ids, rng.randint(0, min(10, len(user_ids))))
+                ]
+
+        Plan.objects.bulk_create(plans)
+        Volunteer.objects.bulk_create(volunteers)
+        ProposedDate.objects.bulk_create(dates)
+        DateVote.objects.bulk_create(date_votes)
+        Plan.objects.refresh_best_dates()
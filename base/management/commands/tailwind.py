@@ -1,33 +1,161 @@
-from django.core.management.base import BaseCommand
-from django.core import management
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+from contextlib import contextmanager
+
 from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core import management
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Files tailwind scans for class names, matching the content globs in tailwind.config.js
+SCANNED_EXTENSIONS = (".html", ".js", ".py")
+# Directories under BASE_DIR that never hold source tailwind should see. Hidden directories are skipped too.
+SKIPPED_DIRECTORIES = {"staticfiles", "venv", "node_modules", "__pycache__"}
+# Ignored by collectstatic like every other dotfile, so the stamps never end up in STATIC_ROOT's manifest
+COLLECTED_STAMP = ".collectstatic.json"
 
-import subprocess
 
 class Command(BaseCommand):
-    help = "Initiate the tailwind css compiler."
-    
+    help = (
+        "Build the tailwind css, skipping the build when its inputs haven't changed since the last one. "
+        "With --deploy the build is minified and collectstatic runs only if a static file changed."
+    )
+
     def add_arguments(self, parser):
         parser.add_argument(
             "-w", "--watch",
             action="store_true",
             help="Run in watch mode",
         )
-        
+
         parser.add_argument(
             "-d", "--deploy",
             action="store_true",
             help="Minify tailwind and collect static"
         )
-        
+
+        parser.add_argument(
+            "-f", "--force",
+            action="store_true",
+            help="Build and collect static even if nothing changed"
+        )
+
     def handle(self, *args, **options):
         input_path = settings.TAILWIND_INPUT_FILE
         output_path = settings.TAILWIND_OUTPUT_FILE
-        
-        subprocess.call(["tailwindcss", "-i", input_path, "-o", output_path, "--watch" if options["watch"] else ""])
-    
+
+        if options["watch"]:
+            subprocess.call(["tailwindcss", "-i", input_path, "-o", output_path, "--watch"])
+            return
+
+        minify = options["deploy"]
+        with self.phase("hash inputs"):
+            inputs = hash_inputs(input_path, minify)
+
+        stamp_path = build_stamp_path(output_path)
+        if not options["force"] and read_stamp(stamp_path) == {"inputs": inputs, "output": hash_file(output_path)}:
+            self.stdout.write("tailwind build: skipped, main.css is current")
+        else:
+            with self.phase("tailwind build"):
+                command = ["tailwindcss", "-i", input_path, "-o", output_path]
+                if minify:
+                    command.append("--minify")
+                if subprocess.call(command) != 0:
+                    raise CommandError("tailwindcss failed")
+                write_stamp(stamp_path, {"inputs": inputs, "output": hash_file(output_path)})
+
         if options["deploy"]:
-            subprocess.call(["tailwindcss", "-o", output_path, "--minify"])
-            management.call_command("collectstatic", "--no-input", "--ignore=input.css")
-    
-    
\ No newline at end of file
+            self.collect_static(options["force"])
+
+    def collect_static(self, force):
+        with self.phase("hash static files"):
+            static_files = hash_static_files()
+
+        stamp_path = os.path.join(settings.STATIC_ROOT, COLLECTED_STAMP)
+        collected = read_stamp(stamp_path) or {}
+        changed = [path for path, digest in static_files.items() if collected.get(path) != digest]
+        removed = collected.keys() - static_files.keys()
+        if not force and not changed and not removed:
+            self.stdout.write("collectstatic: skipped, no static files changed")
+            return
+
+        # collectstatic only copies files newer than the collected copy, but the manifest storage hashes and
+        # compresses every file it finds, so it runs as a whole once anything changed
+        with self.phase(f"collectstatic ({len(changed)} changed, {len(removed)} removed)"):
+            management.call_command("collectstatic", "--no-input", "--ignore=input.css", verbosity=0)
+            write_stamp(stamp_path, static_files)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        self.stdout.write(f"{name}: {time.perf_counter() - start:.2f}s")
+
+
+def hash_file(path):
+    try:
+        with open(path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def hash_inputs(input_path, minify):
+    """
+        A digest of everything a tailwind build depends on: input.css, tailwind.config.js, every file tailwind
+        scans in the project and the directories input.css adds with @source.
+    """
+    base_dir = str(settings.BASE_DIR)
+    paths = [input_path, os.path.join(base_dir, "tailwind.config.js")]
+    paths += scanned_files(base_dir)
+    with open(input_path) as file:
+        for source in re.findall(r'@source\s+"([^"]+)"', file.read()):
+            paths += scanned_files(os.path.normpath(os.path.join(os.path.dirname(input_path), source)))
+
+    digest = hashlib.sha256(b"minify" if minify else b"")
+    for path in sorted(set(paths) - {settings.TAILWIND_OUTPUT_FILE}):
+        digest.update(os.path.relpath(path, base_dir).encode())
+        digest.update((hash_file(path) or "").encode())
+    return digest.hexdigest()
+
+
+def scanned_files(directory):
+    for root, directories, files in os.walk(directory):
+        directories[:] = [name for name in directories if name not in SKIPPED_DIRECTORIES and not name.startswith(".")]
+        for name in files:
+            if name.endswith(SCANNED_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+def hash_static_files():
+    # Keyed by the path each file is collected to, the same way collectstatic finds them
+    static_files = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(["CVS", ".*", "*~", "input.css"]):
+            prefix = getattr(storage, "prefix", None)
+            static_files.setdefault(os.path.join(prefix, path) if prefix else path, hash_file(storage.path(path)))
+    return static_files
+
+
+def build_stamp_path(output_path):
+    directory, name = os.path.split(output_path)
+    return os.path.join(directory, f".{name}.json")
+
+
+def read_stamp(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_stamp(path, contents):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(contents, file, indent=2, sort_keys=True)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:32
+
+from django.db import migrations, models
+
+
+def add_construction_notice(apps, schema_editor):
+    # Replaces the flash message the home view used to add on every request
+    Announcement = apps.get_model("base", "Announcement")
+    Announcement.objects.create(message="Please excuse our mess. This site is still under construction.")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Announcement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.CharField(max_length=255)),
+                ('level', models.CharField(choices=[('info', 'Info'), ('success', 'Success'), ('warning', 'Warning'), ('error', 'Error')], default='info', max_length=7)),
+                ('active', models.BooleanField(default=True)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(add_construction_notice, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,43 @@
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+from .page_cache import invalidate_cached_pages
+
+
+ACTIVE_ANNOUNCEMENTS_KEY = "announcements:active"
+# Announcements are deleted from the cache whenever one changes, so the timeout only bounds a missed invalidation
+ACTIVE_ANNOUNCEMENTS_TIMEOUT = 60 * 60
+
+
+class Announcement(models.Model):
+    # A site-wide notice shown to every visitor, in place of per-request flash messages that need a session
+    class Level(models.TextChoices):
+        # Same names as the django.contrib.messages tags, so the notification partial renders both
+        INFO = "info", _("Info")
+        SUCCESS = "success", _("Success")
+        WARNING = "warning", _("Warning")
+        ERROR = "error", _("Error")
+
+    message = models.CharField(max_length=255)
+    level = models.CharField(max_length=7, choices=Level.choices, default=Level.INFO)
+    active = models.BooleanField(default=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.message[:50]
+
+
+def invalidate_announcements(**kwargs):
+    # post_save and post_delete receiver (see BaseConfig.ready), so the admin's bulk delete invalidates too
+    transaction.on_commit(lambda: cache.delete(ACTIVE_ANNOUNCEMENTS_KEY))
+    invalidate_cached_pages()
+
+
+def active_announcements():
+    # Read on every page, so served from the cache. Doesn't touch the session, so anonymous pages stay cookie-free.
+    announcements = cache.get(ACTIVE_ANNOUNCEMENTS_KEY)
+    if announcements is None:
+        announcements = list(Announcement.objects.filter(active=True).order_by("created_on", "id"))
+        cache.set(ACTIVE_ANNOUNCEMENTS_KEY, announcements, ACTIVE_ANNOUNCEMENTS_TIMEOUT)
+    return announcements
@@ -0,0 +1,135 @@
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.db import transaction
+
+
+# Holds the current page cache version, the time of the last write that changed what the cached pages show.
+# Every cached page is keyed on it, so moving it on makes all of them unreachable at once.
+VERSION_KEY = "page_cache:version"
+
+
+def page_cache():
+    # A dedicated "pages" cache if one is configured in settings.CACHES, otherwise the default cache
+    try:
+        return caches["pages"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def new_version():
+    page_cache().set(VERSION_KEY, time.time(), None)
+
+
+def invalidate_cached_pages():
+    """
+        Retires every cached page after a write to the data they show.
+
+        The version moves on immediately and again once the current transaction commits. A page rendered in
+        between, from data that was not yet committed, is cached under the first version and never served.
+    """
+    new_version()
+    transaction.on_commit(new_version)
+
+
+def is_cacheable_request(request):
+    # Anonymous visitors carry no cookies at all, or only the CSRF cookie from a form they saw elsewhere
+    return (
+        request.method in ("GET", "HEAD")
+        and getattr(settings, "PAGE_CACHE_TIMEOUT", 0) > 0
+        and all(name == settings.CSRF_COOKIE_NAME for name in request.COOKIES)
+    )
+
+
+def current_version(cache):
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def acurrent_version(cache):
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time(), None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def page_key(request, version):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f"page:{version}:{url}"
+
+
+def is_shared_response(request, response):
+    # Only responses that are the same for every anonymous visitor are cached
+    return not (
+        response.status_code != 200
+        or response.streaming
+        or response.cookies
+        or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+    )
+
+
+def store_page(request, response, cache, key, version):
+    if not is_shared_response(request, response):
+        return
+    # With replicas, a page rendered straight after a write may be from a replica that hasn't caught up with it
+    if settings.REPLICA_DATABASES and time.time() - version < settings.REPLICA_PIN_SECONDS:
+        return
+
+    # Template responses can only be pickled once rendered, which Django does after the view returns. For async
+    # views that happens in a thread, so the blocking set() is fine there too. Rendering a {% csrf_token %} or
+    # anything else that sets a cookie makes the page per-visitor, so it's checked again once rendered.
+    if hasattr(response, "render") and callable(response.render):
+        def cache_rendered(rendered):
+            if is_shared_response(request, rendered):
+                cache.set(key, rendered, settings.PAGE_CACHE_TIMEOUT)
+
+        response.add_post_render_callback(cache_rendered)
+    else:
+        cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+
+
+def cache_anonymous_page(view):
+    """
+        Decorates a view, sync or async, to serve anonymous visitors the whole response from the page cache for up
+        to PAGE_CACHE_TIMEOUT seconds, until invalidate_cached_pages() is called.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return await view(request, *args, **kwargs)
+
+            cache = page_cache()
+            version = await acurrent_version(cache)
+            key = page_key(request, version)
+            response = await cache.aget(key)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+                store_page(request, response, cache, key, version)
+            return response
+
+        return markcoroutinefunction(wrapper)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view(request, *args, **kwargs)
+
+        cache = page_cache()
+        version = current_version(cache)
+        key = page_key(request, version)
+        response = cache.get(key)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            store_page(request, response, cache, key, version)
+        return response
+
+    return wrapper
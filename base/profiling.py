@@ -0,0 +1,169 @@
+import json
+import logging
+import random
+import traceback
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+
+logger = logging.getLogger("projectCTW.profiling")
+
+# The profile of the request currently being handled, read by the query wrapper and the template backend
+current_profile = ContextVar("current_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self, sampled):
+        self.sampled = sampled
+        self.db_time = 0.0
+        self.query_count = 0
+        self.template_time = 0.0
+        self.queries = []
+
+    def record(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            self.db_time += duration
+            self.query_count += 1
+            if self.sampled:
+                self.queries.append({
+                    "sql": sql,
+                    "duration_ms": round(duration * 1000, 3),
+                    "alias": context["connection"].alias,
+                    "call_site": call_site(),
+                })
+
+
+def profile_query(execute, sql, params, many, context):
+    # Database execute_wrapper attributing each query to the request being profiled, if any. The ContextVar is
+    # copied into the threads the async ORM runs queries in, so they are attributed too.
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile.record(execute, sql, params, many, context)
+
+
+def install_query_profiler(sender, connection, **kwargs):
+    # connection_created receiver (see BaseConfig.ready). Every thread has its own connections, so the wrapper is
+    # added to each as it opens rather than per request.
+    if profile_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_query)
+
+
+def call_site():
+    # The innermost frame from the project's own code, skipping Django, other installed packages and this module
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        if (
+            frame.filename.startswith(base_dir)
+            and "site-packages" not in frame.filename
+            and frame.filename != __file__
+        ):
+            return f"{frame.filename[len(base_dir) + 1:]}:{frame.lineno} in {frame.name}"
+    return None
+
+
+class ProfilingMiddleware:
+    """
+        Times each request's database queries, template rendering and overall handling and reports them in a
+        Server-Timing response header when PROFILING_SERVER_TIMING is on.
+
+        A PROFILING_SAMPLE_RATE fraction of requests additionally logs every query with its duration and call
+        site as one JSON record on the "projectCTW.profiling" logger. Unsampled requests only pay for a few
+        counters.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        self.server_timing = getattr(settings, "PROFILING_SERVER_TIMING", settings.DEBUG)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        profile = RequestProfile(sampled=self.sample_rate > 0 and random.random() < self.sample_rate)
+        token = current_profile.set(profile)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile, perf_counter() - start)
+
+    async def __acall__(self, request):
+        profile = RequestProfile(sampled=self.sample_rate > 0 and random.random() < self.sample_rate)
+        token = current_profile.set(profile)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile, perf_counter() - start)
+
+    def finish(self, request, response, profile, total_time):
+        if self.server_timing:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={profile.db_time * 1000:.1f};desc="{profile.query_count} queries"',
+                f"tpl;dur={profile.template_time * 1000:.1f}",
+                f"total;dur={total_time * 1000:.1f}",
+            ])
+
+        if profile.sampled:
+            logger.info(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": round(total_time * 1000, 3),
+                "db_ms": round(profile.db_time * 1000, 3),
+                "template_ms": round(profile.template_time * 1000, 3),
+                "query_count": profile.query_count,
+                "queries": profile.queries,
+            }))
+
+        return response
+
+
+class ProfiledTemplate:
+    # Wraps a django.template.backends.django.Template to add its render time to the current request's profile
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        profile = current_profile.get()
+        if profile is None:
+            return self.template.render(context, request)
+
+        start = perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            profile.template_time += perf_counter() - start
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """
+        The Django template backend, timing each top-level render for ProfilingMiddleware. Included templates are
+        rendered inside their parent, so they are counted once as part of it.
+    """
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name))
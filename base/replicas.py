@@ -0,0 +1,156 @@
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+
+# Cookie marking a browser that wrote recently, so its reads stay on the primary until the replicas catch up
+PIN_COOKIE = "db_primary"
+# Apps whose rows are read back straight after being written on nearly every request. Always on the primary.
+PRIMARY_ONLY_APPS = {"sessions", "jobs"}
+
+# The routing state of the request currently being handled, read by ReplicaRouter
+routing_state = ContextVar("routing_state", default=None)
+
+
+class RoutingState:
+    def __init__(self, pinned):
+        # Whether the visitor wrote within the last REPLICA_PIN_SECONDS
+        self.pinned = pinned
+        # The replica alias reads go to while a read_from_replica view runs, otherwise None for the primary
+        self.replica = None
+        self.wrote = False
+
+
+class ReplicaRouter:
+    """
+        Sends reads made inside a read_from_replica view to the replica chosen for the request, and every other
+        query to the primary ("default"). Writes are noted on the request's RoutingState so ReplicaMiddleware can
+        pin the visitor to the primary.
+
+        Replicas are expected to be copies of the primary kept up to date outside Django, so they are never
+        migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if state is None or state.replica is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+def read_from_replica(view):
+    """
+        Decorates a read-only view, sync or async, so its GET and HEAD requests read from a random replica, unless
+        no replicas are configured or the visitor is pinned to the primary after a recent write. Template responses
+        are rendered before the wrapper returns, so the queries their templates make read from the replica too.
+    """
+
+    def start(request):
+        state = routing_state.get()
+        if state is None or state.pinned or not settings.REPLICA_DATABASES or request.method not in ("GET", "HEAD"):
+            return None
+        state.replica = random.choice(settings.REPLICA_DATABASES)
+        return state
+
+    def stop(state):
+        if state is not None:
+            state.replica = None
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            state = start(request)
+            try:
+                response = await view(request, *args, **kwargs)
+                if is_unrendered(response):
+                    # In a thread, as Django's handler would have rendered it
+                    response = await sync_to_async(response.render)()
+                return response
+            finally:
+                stop(state)
+
+        return markcoroutinefunction(wrapper)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = start(request)
+        try:
+            response = view(request, *args, **kwargs)
+            if is_unrendered(response):
+                response = response.render()
+            return response
+        finally:
+            stop(state)
+
+    return wrapper
+
+
+def is_unrendered(response):
+    return hasattr(response, "render") and callable(response.render) and not response.is_rendered
+
+
+class ReplicaMiddleware:
+    """
+        Tracks writes for read-your-writes consistency. A response to a request that wrote anything sets a
+        short-lived cookie, and requests carrying it read only from the primary, so people see their own votes
+        and comments even while the replicas lag behind.
+
+        Not used when no replicas are configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, "REPLICA_PIN_SECONDS", 10)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state = RoutingState(pinned=PIN_COOKIE in request.COOKIES)
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        state = RoutingState(pinned=PIN_COOKIE in request.COOKIES)
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(response, state)
+
+    def finish(self, response, state):
+        if state.wrote:
+            response.set_cookie(PIN_COOKIE, "1", max_age=self.pin_seconds, httponly=True, samesite="Lax")
+        return response
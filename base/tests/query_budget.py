@@ -0,0 +1,60 @@
+import re
+from collections import Counter
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+        Test case mixin asserting that a view runs the same number of SQL queries no matter how much data it
+        renders, e.g. that adding a field to a feed card didn't add a query per card.
+
+        Usage: self.assertQueriesDoNotGrow(lambda: self.client.get(url), grow=lambda: <create more rows>)
+    """
+
+    def capture_queries(self, request):
+        # Cached fragments would hide queries made while rendering them, so always measure a cold render
+        for cache in caches.all():
+            cache.clear()
+
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        self.assertLess(response.status_code, 400, f"Request failed with status {response.status_code}")
+        return [query["sql"] for query in context.captured_queries]
+
+    def assertQueriesDoNotGrow(self, request, grow, budget=None):
+        """
+            Renders the view, calls grow() to add data, renders it again and fails if the second render ran more
+            queries than the first, or more than budget when one is given.
+        """
+        # Warm up once so one-off work such as loading the session isn't mistaken for growth
+        request()
+        small = self.capture_queries(request)
+        grow()
+        large = self.capture_queries(request)
+
+        if len(large) > len(small) or (budget is not None and len(large) > budget):
+            self.fail(self.format_budget_failure(small, large, budget))
+
+    @staticmethod
+    def normalize_query(sql):
+        # Strip literals so the same query issued for different rows is grouped together
+        sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+        return re.sub(r"\b\d+\b", "?", sql)
+
+    def format_budget_failure(self, small, large, budget):
+        lines = [
+            f"{len(small)} queries before growing the dataset, {len(large)} after"
+            + (f" (budget {budget})" if budget is not None else "")
+            + ".",
+            "",
+            "Queries repeated in the larger render:",
+        ]
+        repeated = Counter(self.normalize_query(sql) for sql in large).most_common()
+        lines += [f"  {count}x {sql}" for sql, count in repeated if count > 1] or ["  (none)"]
+
+        lines += ["", "All queries in the larger render:"]
+        lines += [f"  {i}. {sql}" for i, sql in enumerate(large, 1)]
+        return "\n".join(lines)
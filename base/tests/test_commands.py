@@ -0,0 +1,142 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.template import engines
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from events.models import Comment, Event, Plan, ProposedDate
+from ..warmup import pending_migrations, warm_up
+
+
+class SeedDataTests(TestCase):
+    def test_seeds_consistent_dataset(self):
+        call_command(
+            "seed_data", users=10, events=30, plan_ratio=0.5, batch_size=7, seed=1, stdout=StringIO()
+        )
+
+        self.assertEqual(get_user_model().objects.count(), 10)
+        self.assertEqual(Event.objects.count(), 30)
+        self.assertTrue(Plan.objects.exists())
+        self.assertTrue(ProposedDate.objects.exists())
+
+        # The denormalized counters match the rows that were bulk inserted
+        for event in Event.objects.all():
+            self.assertEqual(event.upvote_count, event.upvotes.count())
+            self.assertEqual(event.comment_count, Comment.objects.filter(event=event).count())
+            self.assertIsNotNone(event.trending_updated_on)
+
+    def test_can_seed_twice(self):
+        call_command("seed_data", users=3, events=2, stdout=StringIO())
+        call_command("seed_data", users=3, events=2, stdout=StringIO())
+        self.assertEqual(get_user_model().objects.count(), 6)
+
+
+class TailwindTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.input = os.path.join(directory.name, "input.css")
+        self.output = os.path.join(directory.name, "main.css")
+        with open(self.input, "w") as file:
+            file.write('@import "tailwindcss";\n')
+
+        settings = override_settings(
+            TAILWIND_INPUT_FILE=self.input,
+            TAILWIND_OUTPUT_FILE=self.output,
+            STATIC_ROOT=os.path.join(directory.name, "staticfiles"),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.builds = []
+        build = mock.patch("base.management.commands.tailwind.subprocess.call", side_effect=self.build)
+        build.start()
+        self.addCleanup(build.stop)
+        collect = mock.patch("base.management.commands.tailwind.management.call_command")
+        self.collectstatic = collect.start()
+        self.addCleanup(collect.stop)
+
+    def build(self, command):
+        self.builds.append(command)
+        with open(self.output, "w") as file:
+            file.write(f"/* built {len(self.builds)} */")
+        return 0
+
+    def tailwind(self, *args):
+        stdout = StringIO()
+        call_command("tailwind", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_skips_builds_when_inputs_are_unchanged(self):
+        self.tailwind()
+        output = self.tailwind()
+        self.assertEqual(len(self.builds), 1)
+        self.assertIn("tailwind build: skipped", output)
+
+        with open(self.input, "a") as file:
+            file.write("@theme { --color-primary: #000; }\n")
+        self.tailwind()
+        self.assertEqual(len(self.builds), 2)
+
+    def test_rebuilds_when_the_output_was_overwritten(self):
+        self.tailwind()
+        with open(self.output, "w") as file:
+            file.write("/* from tailwind --watch */")
+        self.tailwind()
+        self.assertEqual(len(self.builds), 2)
+
+    def test_deploy_builds_minified_in_one_pass(self):
+        self.tailwind()
+        output = self.tailwind("--deploy")
+        self.assertEqual(self.builds[-1], ["tailwindcss", "-i", self.input, "-o", self.output, "--minify"])
+        self.assertEqual(len(self.builds), 2)
+        self.assertIn("tailwind build: ", output)
+        self.assertIn("collectstatic (", output)
+
+    def test_deploy_collects_static_only_when_files_changed(self):
+        self.tailwind("--deploy")
+        self.assertEqual(self.collectstatic.call_count, 1)
+
+        output = self.tailwind("--deploy")
+        self.assertEqual(self.collectstatic.call_count, 1)
+        self.assertIn("collectstatic: skipped", output)
+
+        self.tailwind("--deploy", "--force")
+        self.assertEqual(len(self.builds), 2)
+        self.assertEqual(self.collectstatic.call_count, 2)
+
+
+class BootTests(TestCase):
+    def boot(self):
+        stdout = StringIO()
+        with mock.patch("base.management.commands.boot.Command.serve") as serve:
+            call_command("boot", "--", "--workers=3", stdout=stdout)
+        serve.assert_called_once()
+        self.assertEqual(serve.call_args.args[1], ["--workers=3"])
+        return stdout.getvalue()
+
+    def test_migrates_only_when_migrations_are_pending(self):
+        self.assertEqual(pending_migrations(), [])
+        with mock.patch("base.management.commands.boot.management.call_command") as migrate:
+            output = self.boot()
+        migrate.assert_not_called()
+        self.assertIn("migration check: ", output)
+        self.assertIn("load and warm up: ", output)
+
+        with (
+            mock.patch("base.management.commands.boot.pending_migrations", return_value=["0001_initial"]),
+            mock.patch("base.management.commands.boot.management.call_command") as migrate,
+        ):
+            self.boot()
+        migrate.assert_called_once_with("migrate", interactive=False, verbosity=0)
+
+    def test_warm_up_compiles_the_project_templates(self):
+        loader = engines["django"].engine.template_loaders[0]
+        loader.reset()
+        warm_up()
+        self.assertIn("base.html", loader.get_template_cache)
+        self.assertIn("events/proposed_events.html", loader.get_template_cache)
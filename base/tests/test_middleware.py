@@ -0,0 +1,47 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import active_announcements
+
+
+@override_settings(PROFILING_SERVER_TIMING=True)
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        # Cache the site announcements so the feed's query is the only one
+        active_announcements()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("proposals"))
+        timing = response["Server-Timing"]
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn("tpl;dur=", timing)
+        self.assertIn("total;dur=", timing)
+
+    @override_settings(PROFILING_SERVER_TIMING=False)
+    def test_server_timing_can_be_disabled(self):
+        response = self.client.get(reverse("proposals"))
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_unsampled_requests_are_not_logged(self):
+        with self.assertNoLogs("projectCTW.profiling"):
+            self.client.get(reverse("proposals"))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_request_logs_queries(self):
+        with self.assertLogs("projectCTW.profiling", level="INFO") as logs:
+            self.client.get(reverse("proposals"))
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["path"], reverse("proposals"))
+        self.assertEqual(record["query_count"], 1)
+        self.assertIn("events_event", record["queries"][0]["sql"])
+        self.assertTrue(record["queries"][0]["call_site"].startswith("events/"))
+
+    @override_settings(ROOT_URLCONF="projectCTW.async_urls")
+    async def test_counts_queries_from_async_views(self):
+        # The async ORM runs queries in other threads, which must still be attributed to the request
+        response = await self.async_client.get(reverse("proposals"))
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
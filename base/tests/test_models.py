@@ -0,0 +1,39 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import Announcement, active_announcements
+
+
+class AnnouncementTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_migration_adds_construction_notice(self):
+        self.assertIn("under construction", active_announcements()[0].message)
+
+    def test_active_announcements_are_cached(self):
+        active_announcements()
+        with self.assertNumQueries(0):
+            active_announcements()
+
+    def test_changes_invalidate(self):
+        Announcement.objects.all().delete()
+        self.assertEqual(active_announcements(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            announcement = Announcement.objects.create(message="Maintenance tonight", level=Announcement.Level.WARNING)
+        self.assertEqual(active_announcements(), [announcement])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            announcement.active = False
+            announcement.save()
+        self.assertEqual(active_announcements(), [])
+
+    def test_bulk_delete_invalidates(self):
+        Announcement.objects.create(message="Maintenance tonight")
+        self.assertEqual(len(active_announcements()), 2)
+
+        # As the admin's "delete selected" action does
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.all().delete()
+        self.assertEqual(active_announcements(), [])
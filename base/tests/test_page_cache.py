@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template import engines
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from events.models import Event
+from ..page_cache import cache_anonymous_page
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=60)
+class PageCacheTests(TestCase):
+    password = "testpass123"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "cacheuser",
+            email = "cacheuser@email.com",
+            password = cls.password
+        )
+        cls.event = Event.objects.create(
+            name = "cachedevent",
+            description = "cached event description",
+            location = "the web",
+            created_by = cls.user,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def assertServedFromCache(self, url, cached=True):
+        self.client.get(url)
+        with self.assertNumQueries(0 if cached else 1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.templates == [], cached)
+        return response
+
+    def test_anonymous_pages_are_cached(self):
+        for name in ("home", "about", "proposals"):
+            with self.subTest(name):
+                self.assertServedFromCache(reverse(name))
+
+    def test_query_strings_are_cached_separately(self):
+        self.client.get(reverse("proposals"))
+        response = self.client.get(reverse("proposals"), {"sort": "votes"})
+        self.assertEqual(response.context["sort"], "votes")
+
+    def test_csrf_cookie_alone_is_still_anonymous(self):
+        self.client.cookies["csrftoken"] = "x" * 32
+        self.assertServedFromCache(reverse("proposals"))
+
+    def test_visitors_with_cookies_are_not_cached(self):
+        self.client.login(email = self.user.email, password = self.password)
+        response = self.client.get(reverse("proposals"))
+        self.assertTrue(response.templates)
+        response = self.client.get(reverse("proposals"))
+        self.assertTrue(response.templates)
+
+    def test_event_writes_invalidate(self):
+        self.client.get(reverse("proposals"))
+        Event.objects.create(name = "newevent", description = "d", location = "l", created_by = self.user)
+        self.assertContains(self.client.get(reverse("proposals")), "newevent")
+
+        voter = self.client_class()
+        voter.login(email = self.user.email, password = self.password)
+        voter.post(reverse("upvote", kwargs={"pk": self.event.pk}))
+        response = self.client.get(reverse("proposals"), {"sort": "votes"})
+        self.assertEqual(response.context["events"][0].upvote_count, 1)
+
+    def test_event_deletes_invalidate(self):
+        other = Event.objects.create(name = "deletedevent", description = "d", location = "l", created_by = self.user)
+        self.assertContains(self.client.get(reverse("proposals")), "deletedevent")
+        # As the admin's "delete selected" action does
+        Event.objects.filter(pk=other.pk).delete()
+        self.assertNotContains(self.client.get(reverse("proposals")), "deletedevent")
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        self.assertServedFromCache(reverse("proposals"), cached=False)
+
+    @override_settings(REPLICA_DATABASES=["default"])
+    def test_not_cached_while_replicas_may_lag(self):
+        self.event.save()
+        self.assertServedFromCache(reverse("proposals"), cached=False)
+
+    def test_responses_with_a_csrf_token_are_not_cached(self):
+        calls = []
+
+        @cache_anonymous_page
+        def form_view(request):
+            calls.append(request)
+            return HttpResponse(get_token(request))
+
+        for _ in range(2):
+            form_view(RequestFactory().get("/form/"))
+        self.assertEqual(len(calls), 2)
+
+    def test_templates_that_render_a_csrf_token_are_not_cached(self):
+        calls = []
+
+        @cache_anonymous_page
+        def form_view(request):
+            calls.append(request)
+            return TemplateResponse(request, engines["django"].from_string("{% csrf_token %}"))
+
+        for _ in range(2):
+            request = RequestFactory().get("/form/")
+            request.user = AnonymousUser()
+            form_view(request).render()
+        self.assertEqual(len(calls), 2)
+
+    @override_settings(ROOT_URLCONF="projectCTW.async_urls")
+    async def test_async_proposals(self):
+        await self.async_client.get(reverse("proposals"))
+        response = await self.async_client.get(reverse("proposals"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.templates, [])
@@ -0,0 +1,129 @@
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.template import engines
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from events.models import Event
+from ..replicas import PIN_COOKIE, ReplicaRouter, RoutingState, read_from_replica, routing_state
+
+
+@override_settings(REPLICA_DATABASES=["replica"])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+        Runs against a second SQLite file standing in for a replica. setUp copies the primary into it, so anything
+        written afterwards exists only on the primary, like a replica that hasn't caught up yet.
+    """
+    # Resolved when the class is set up, by which time the replica alias exists. Only "default" is checked and
+    # migrated by the test runner.
+    databases = "__all__"
+    password = "testpass123"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        replica = {"ENGINE": "django.db.backends.sqlite3", "NAME": os.path.join(cls.directory.name, "replica.sqlite3")}
+        # configure_settings fills in the defaults for every option, and insists on seeing "default" alongside
+        configured = connections.configure_settings({"default": connections.settings["default"], "replica": replica})
+        connections.settings["replica"] = configured["replica"]
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username = "replicauser",
+            email = "replicauser@email.com",
+            password = self.password
+        )
+        self.event = Event.objects.create(
+            name = "replicaevent",
+            description = "replica event description",
+            location = "the web",
+            created_by = self.user,
+        )
+        self.replicate()
+        # A vote the replica hasn't seen yet
+        Event.objects.filter(pk=self.event.pk).update(upvote_count=5)
+
+    def replicate(self):
+        for alias in ("default", "replica"):
+            connections[alias].ensure_connection()
+        connections["default"].connection.backup(connections["replica"].connection)
+
+    def test_read_views_use_the_replica(self):
+        response = self.client.get(reverse("proposals"))
+        self.assertEqual(response.context["events"][0].upvote_count, 0)
+
+        response = self.client.get(self.event.get_absolute_url())
+        self.assertEqual(response.context["event"].upvote_count, 0)
+
+        response = self.client.get(reverse("user_profile", kwargs={"slug": self.user.username}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_other_views_use_the_primary(self):
+        response = self.client.get(reverse("searchEvents"), {"q": "replicaevent"})
+        self.assertEqual(response.context["events"][0].upvote_count, 5)
+
+    def test_writers_read_their_writes(self):
+        self.client.login(email = self.user.email, password = self.password)
+        response = self.client.get(self.event.get_absolute_url())
+        self.assertEqual(response.context["event"].upvote_count, 0)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        response = self.client.post(reverse("upvote", kwargs={"pk": self.event.pk}))
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 10)
+
+        response = self.client.get(self.event.get_absolute_url())
+        self.assertEqual(response.context["event"].upvote_count, 6)
+
+    def test_posts_use_the_primary(self):
+        self.client.login(email = self.user.email, password = self.password)
+        response = self.client.post(self.event.get_absolute_url(), {"comment": "a comment"})
+        self.assertRedirects(response, self.event.get_absolute_url(), fetch_redirect_response=False)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(Event.objects.get(pk=self.event.pk).comment_count, 1)
+
+    def test_templates_read_from_the_replica(self):
+        @read_from_replica
+        def lazy_view(request):
+            # The queryset is only evaluated once the template renders
+            template = engines["django"].from_string("{{ events.0.upvote_count }}")
+            return TemplateResponse(request, template, {"events": Event.objects.all()})
+
+        request = RequestFactory().get("/lazy/")
+        request.user = AnonymousUser()
+        # As ReplicaMiddleware sets it, around the handler rendering the response
+        token = routing_state.set(RoutingState(pinned=False))
+        try:
+            response = lazy_view(request).render()
+        finally:
+            routing_state.reset(token)
+        self.assertEqual(response.content, b"0")
+
+    @override_settings(ROOT_URLCONF="projectCTW.async_urls")
+    async def test_async_views_use_the_replica(self):
+        response = await self.async_client.get(reverse("proposals"))
+        self.assertEqual(response.context["events"][0].upvote_count, 0)
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas(self):
+        response = self.client.get(reverse("proposals"))
+        self.assertEqual(response.context["events"][0].upvote_count, 5)
+
+    def test_replicas_are_never_migrated(self):
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate("replica", "events"))
+        self.assertIsNone(router.allow_migrate("default", "events"))
+        self.assertEqual(router.db_for_write(Event), "default")
@@ -1,8 +1,17 @@
-from django.test import SimpleTestCase
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from .query_budget import QueryBudgetMixin
+
 
-class HomepageTests(SimpleTestCase):
+class HomepageTests(TestCase):
     def test_url_exists_at_correct_location(self):
         response = self.client.get("/")
         self.assertEqual(response.status_code, 200)
@@ -20,7 +29,20 @@ class HomepageTests(SimpleTestCase):
         self.assertContains(response, "Empower Your Community")
 
 
-class AboutpageTests(SimpleTestCase):
+class AnonymousHomepageTests(TestCase):
+    def test_no_session_or_cookies(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("home"))
+
+        self.assertContains(response, "This site is still under construction.")
+        self.assertEqual(response.cookies, {})
+        self.assertFalse(response.has_header("Set-Cookie"))
+        self.assertFalse(Session.objects.exists())
+        self.assertFalse([query["sql"] for query in queries if "django_session" in query["sql"]])
+
+
+class AboutpageTests(TestCase):
     def test_url_exists_at_correct_location(self):
         response = self.client.get("/about/")
         self.assertEqual(response.status_code, 200)
@@ -37,3 +59,15 @@ class AboutpageTests(SimpleTestCase):
     #     response = self.client.get(reverse("about"))
     #     self.assertContains(response, "Our Mission")
     #     self.assertNotContains(response, "Welcome")
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def seed_events(self):
+        call_command("seed_data", users=10, events=20, seed=1, stdout=StringIO())
+
+    # The only query is for the site announcements, which the budget helper always measures with a cold cache
+    def test_home(self):
+        self.assertQueriesDoNotGrow(lambda: self.client.get(reverse("home")), self.seed_events, budget=1)
+
+    def test_about(self):
+        self.assertQueriesDoNotGrow(lambda: self.client.get(reverse("about")), self.seed_events, budget=1)
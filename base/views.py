@@ -1,12 +1,15 @@
 from django.shortcuts import render
 from django.contrib import messages
 
+from .page_cache import cache_anonymous_page
 
+
+@cache_anonymous_page
 def home(request):
-    messages.info(request, "Please excuse our mess. This site is still under construction.")
     return render(request, "base/home.html")
 
 
+@cache_anonymous_page
 def about(request):
     return render(request, "base/about.html")
 
@@ -0,0 +1,56 @@
+import os
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.template import TemplateSyntaxError, engines
+from django.urls import get_resolver
+from django.utils import translation
+
+
+def pending_migrations(database=DEFAULT_DB_ALIAS):
+    """
+        The migrations `migrate` would apply. Reads the migration files and the django_migrations table only, unlike
+        `migrate` itself, which also runs the system checks and the post_migrate handlers even when there is nothing
+        to apply.
+    """
+    executor = MigrationExecutor(connections[database])
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+def warm_up():
+    """
+        Does the work that would otherwise slow down the first requests each worker serves: building the URL
+        resolver, which imports every view and form, loading the translation catalog and compiling every template
+        into the cached loader.
+
+        Called when projectCTW.wsgi or projectCTW.asgi is imported, so under gunicorn --preload it runs once in the
+        master process and the workers inherit the result. Never touches the database, as connections must not be
+        shared across the fork.
+    """
+    if not settings.WARM_UP:
+        return
+
+    # Builds the reverse lookup tables, importing every urls module along the way
+    get_resolver().reverse_dict
+
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext("")
+
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            # Third party apps ship templates for optional parts that aren't installed here, which don't compile
+            required = str(directory).startswith(str(settings.BASE_DIR))
+            for name in template_names(directory):
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError:
+                    if required:
+                        raise
+
+
+def template_names(directory):
+    for root, directories, files in os.walk(directory):
+        for name in files:
+            if name.endswith((".html", ".txt")):
+                yield os.path.relpath(os.path.join(root, name), directory)
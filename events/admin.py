@@ -1,7 +1,28 @@
 from django.contrib import admin
-from .models import Event, Plan, ProposedDate, Comment
+from .models import Event, Plan, ProposedDate, Comment, Upvote
 
 admin.site.register(Event)
 admin.site.register(Plan)
 admin.site.register(ProposedDate)
 admin.site.register(Comment)
+
+
+class UpvoteAdmin(admin.ModelAdmin):
+    # Read-only: votes added or deleted here would skip toggle_upvote, so upvote_count, promotion to planning and
+    # the trending rescore would never follow
+    list_display = [
+        "event",
+        "user",
+        "created_on",
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+admin.site.register(Upvote, UpvoteAdmin)
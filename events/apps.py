@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, pre_delete
 
 
 class EventsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "events"
+
+    def ready(self):
+        from .models import (
+            Comment, Event, User, create_plan, decrement_comment_count, invalidate_deleted_event_pages,
+            release_upvotes, release_volunteer_places,
+        )
+        from .signals import status_changed
+
+        post_delete.connect(invalidate_deleted_event_pages, sender=Event, dispatch_uid="events.page_cache")
+        post_delete.connect(decrement_comment_count, sender=Comment, dispatch_uid="events.comment_count")
+        pre_delete.connect(release_upvotes, sender=User, dispatch_uid="events.upvote_count")
+        pre_delete.connect(release_volunteer_places, sender=User, dispatch_uid="events.volunteer_count")
+        status_changed.connect(create_plan, dispatch_uid="events.plan")
@@ -0,0 +1,29 @@
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+
+
+# Names of the {% cache %} fragments in the event templates. Each is keyed on event.pk, event.updated_on,
+# event.upvote_count and event.status, in that order. A promotion changes the status with update(), leaving
+# updated_on alone, so the status has to be part of the key for every process's cache to drop the old badge.
+EVENT_FRAGMENTS = ["event_card", "event_sidebar"]
+
+
+def fragment_cache():
+    # Same lookup as Django's {% cache %} tag: a dedicated "template_fragments" cache if one is configured in
+    # settings.CACHES, otherwise the default cache.
+    try:
+        return caches["template_fragments"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def invalidate_event_fragments(pk, updated_on, upvote_count, status):
+    """
+        Deletes the cached fragments for an event as they were keyed before a write.
+
+        The keys already change with updated_on, the vote count and the status, so this mostly stops superseded
+        fragments from lingering in a shared cache until they time out. It also covers writes that change none of
+        them.
+    """
+    vary_on = [pk, updated_on, upvote_count, status]
+    fragment_cache().delete_many([make_template_fragment_key(name, vary_on) for name in EVENT_FRAGMENTS])
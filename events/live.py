@@ -0,0 +1,100 @@
+import asyncio
+import json
+import logging
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import Event
+from .templatetags.event_tags import event_status_color
+
+
+logger = logging.getLogger(__name__)
+
+# Updates buffered per connection before new ones are dropped. A client that far behind is about to get a
+# fresher value for the same event anyway.
+QUEUE_SIZE = 100
+
+
+class InProcessBroker:
+    """
+        Publish/subscribe between the views of a single server process. Subscribers are asyncio queues on the
+        event loop that created them; publish() may be called from any thread, such as a sync view.
+
+        Only connections served by the same process see each other's updates, so this suits one uvicorn process
+        (or development). Deployments with several processes set LIVE_UPDATES_BROKER to a backend with the same
+        three methods on top of a shared channel, e.g. Redis pub/sub or Postgres LISTEN/NOTIFY.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def subscribe(self, topics):
+        # Must be called from a running event loop. Returns the queue the messages for topics arrive on.
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(maxsize=QUEUE_SIZE))
+        with self.lock:
+            for topic in topics:
+                self.subscribers.setdefault(topic, set()).add(subscription)
+        return subscription[1]
+
+    def unsubscribe(self, topics, queue):
+        with self.lock:
+            for topic in topics:
+                subscriptions = self.subscribers.get(topic, set())
+                subscriptions -= {s for s in subscriptions if s[1] is queue}
+                if not subscriptions:
+                    self.subscribers.pop(topic, None)
+
+    def publish(self, topic, message):
+        with self.lock:
+            subscriptions = list(self.subscribers.get(topic, ()))
+        for loop, queue in subscriptions:
+            try:
+                loop.call_soon_threadsafe(offer, queue, message)
+            except RuntimeError:
+                # The subscriber's loop has closed; its connection is gone
+                pass
+
+
+def offer(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        logger.debug("Dropped a live update for a slow subscriber")
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(getattr(settings, "LIVE_UPDATES_BROKER", "events.live.InProcessBroker"))()
+
+
+def event_topic(event_id):
+    return f"event:{event_id}"
+
+
+def event_update_message(event_id, upvote_count, status):
+    return json.dumps({
+        "id": str(event_id),
+        "upvote_count": upvote_count,
+        "status": status,
+        "status_display": str(Event.StatusCode(status).label),
+        # The badge colours, which change with the status too
+        "status_color": event_status_color(status),
+    })
+
+
+def sse_message(data, event="vote"):
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def publish_event_update(event_id, upvote_count, status):
+    """
+        Tells every live connection watching the event about its new vote count and status, once the current
+        transaction commits.
+    """
+    message = event_update_message(event_id, upvote_count, status)
+    transaction.on_commit(lambda: get_broker().publish(event_topic(event_id), message))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = "Recount Event.upvote_count from the upvotes join table and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted events without writing the corrected counts",
+        )
+
+    def handle(self, *args, **options):
+        # Count the join table once per event inside the database instead of per row in Python
+        actual_count = Coalesce(
+            Subquery(
+                Event.upvotes.through.objects.filter(event_id=OuterRef("pk"))
+                .values("event_id")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+
+        drifted = Event.objects.annotate(actual=actual_count).exclude(upvote_count=F("actual"))
+        num_drifted = drifted.count()
+
+        if options["dry_run"]:
+            self.stdout.write(f"{num_drifted} event(s) have a drifted upvote count.")
+            return
+
+        if num_drifted:
+            Event.objects.filter(pk__in=drifted.values("pk")).update(upvote_count=actual_count)
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired upvote count on {num_drifted} event(s)."))
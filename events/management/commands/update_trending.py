@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from events.models import Event, Upvote
+from events.trending import trending_score
+
+
+class Command(BaseCommand):
+    help = "Recompute Event.trending_score for events that received or lost votes since they were last scored."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rescore every event instead of only the ones with new vote activity",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of events scored per query batch",
+        )
+
+    def handle(self, *args, **options):
+        # Taken before any votes are read so a vote cast mid-run is always picked up by the next one
+        run_started = timezone.now()
+
+        events = Event.objects.all()
+        if not options["full"]:
+            new_votes = Upvote.objects.filter(event_id=OuterRef("pk"), created_on__gt=OuterRef("trending_updated_on"))
+            events = events.filter(Q(trending_updated_on__isnull=True) | Exists(new_votes))
+
+        batch_size = options["batch_size"]
+        event_ids = list(events.values_list("pk", flat=True))
+        for start in range(0, len(event_ids), batch_size):
+            self.score_batch(event_ids[start:start + batch_size], run_started)
+
+        self.stdout.write(self.style.SUCCESS(f"Updated trending score on {len(event_ids)} event(s)."))
+
+    def score_batch(self, event_ids, run_started):
+        # An event's creation counts as its first vote so fresh proposals still trend
+        timestamps = defaultdict(list)
+        for pk, created_on in Event.objects.filter(pk__in=event_ids).values_list("pk", "created_on"):
+            timestamps[pk].append(created_on)
+        for pk, created_on in Upvote.objects.filter(event_id__in=event_ids).values_list("event_id", "created_on"):
+            timestamps[pk].append(created_on)
+
+        scored = [
+            Event(pk=pk, trending_score=trending_score(votes), trending_updated_on=run_started)
+            for pk, votes in timestamps.items()
+        ]
+        Event.objects.bulk_update(scored, ["trending_score", "trending_updated_on"])
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_upvote_count(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    Through = Event.upvotes.through
+
+    counts = (
+        Through.objects.filter(event_id=OuterRef("pk"))
+        .values("event_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Event.objects.update(upvote_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_alter_event_id_alter_event_upvotes_alter_plan_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='upvote_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_upvote_count, migrations.RunPython.noop),
+    ]
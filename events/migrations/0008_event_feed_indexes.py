@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_upvote_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'created_on', 'id'], name='event_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'upvote_count', 'id'], name='event_status_upvotes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'updated_on', 'id'], name='event_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_by', 'created_on', 'id'], name='event_creator_created_idx'),
+        ),
+    ]
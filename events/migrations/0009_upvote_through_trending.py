@@ -0,0 +1,74 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_upvote_created_on(apps, schema_editor):
+    # When each existing vote was cast was never recorded. The event's creation is the earliest it can have been,
+    # and keeps old votes from counting as recent ones in the trending score.
+    Event = apps.get_model("events", "Event")
+    Upvote = apps.get_model("events", "Upvote")
+
+    created_on = Event.objects.filter(pk=OuterRef("event_id")).values("created_on")
+    Upvote.objects.update(created_on=Subquery(created_on))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_event_feed_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Adopt the existing auto-created events_event_upvotes table as the Upvote through model. Only the
+        # migration state changes here; the table and its rows are left as they are.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Upvote',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='events.event')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'events_event_upvotes',
+                        'unique_together': {('event', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='event',
+                    name='upvotes',
+                    field=models.ManyToManyField(blank=True, related_name='up_votes', through='events.Upvote', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='upvote',
+            name='created_on',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_upvote_created_on, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='upvote',
+            name='created_on',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='trending_updated_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'trending_score', 'id'], name='event_status_trending_idx'),
+        ),
+    ]
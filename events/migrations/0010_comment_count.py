@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_count(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    Comment = apps.get_model("events", "Comment")
+
+    counts = (
+        Comment.objects.filter(event_id=OuterRef("pk"))
+        .values("event_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Event.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_upvote_through_trending'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_comment_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['event', 'created_on', 'id'], name='comment_event_created_idx'),
+        ),
+    ]
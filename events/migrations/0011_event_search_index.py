@@ -0,0 +1,78 @@
+from django.db import migrations
+
+
+# Postgres: a stored tsvector column computed by the database from the searchable columns, with a GIN index
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE events_event ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX event_search_vector_idx ON events_event USING gin (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS event_search_vector_idx",
+    "ALTER TABLE events_event DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite: an FTS5 shadow table kept in sync with events_event by triggers, so every save, update() and delete
+# is reflected without any application code having to remember to do it
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE events_event_fts USING fts5(
+        event_id UNINDEXED, name, description, location, tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER events_event_fts_insert AFTER INSERT ON events_event BEGIN
+        INSERT INTO events_event_fts (event_id, name, description, location)
+        VALUES (new.id, new.name, new.description, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER events_event_fts_delete AFTER DELETE ON events_event BEGIN
+        DELETE FROM events_event_fts WHERE event_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER events_event_fts_update AFTER UPDATE OF name, description, location ON events_event BEGIN
+        DELETE FROM events_event_fts WHERE event_id = old.id;
+        INSERT INTO events_event_fts (event_id, name, description, location)
+        VALUES (new.id, new.name, new.description, new.location);
+    END
+    """,
+    """
+    INSERT INTO events_event_fts (event_id, name, description, location)
+    SELECT id, name, description, location FROM events_event
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS events_event_fts_update",
+    "DROP TRIGGER IF EXISTS events_event_fts_delete",
+    "DROP TRIGGER IF EXISTS events_event_fts_insert",
+    "DROP TABLE IF EXISTS events_event_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {"postgresql": postgres, "sqlite": sqlite}.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_REVERSE, SQLITE_REVERSE),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def fill_best_dates(apps, schema_editor):
+    # Same query as PlanQuerySet.refresh_best_dates, which historical models don't have
+    Plan = apps.get_model("events", "Plan")
+    ProposedDate = apps.get_model("events", "ProposedDate")
+    best = (
+        ProposedDate.objects.filter(for_plan_id=OuterRef("pk"))
+        .annotate(num_votes=Count("votes"))
+        .filter(num_votes__gt=0)
+        .order_by("-num_votes", "date", "id")
+        .values("pk")[:1]
+    )
+    Plan.objects.update(best_date=Subquery(best))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_event_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plan',
+            name='best_date',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='events.proposeddate'),
+        ),
+        migrations.RunPython(fill_best_dates, migrations.RunPython.noop),
+    ]
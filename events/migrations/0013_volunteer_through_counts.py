@@ -0,0 +1,67 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_volunteers(apps, schema_editor):
+    Plan = apps.get_model("events", "Plan")
+    Volunteer = apps.get_model("events", "Volunteer")
+    Plan.objects.update(volunteer_count=Coalesce(
+        Subquery(
+            Volunteer.objects.filter(plan_id=OuterRef("pk")).values("plan_id").annotate(total=Count("pk")).values("total")
+        ),
+        0,
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_plan_best_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Adopt the existing auto-created events_plan_volunteers table as the Volunteer through model. Only the
+        # migration state changes here; the table and its rows are left as they are.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Volunteer',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='events.plan')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'events_plan_volunteers',
+                        'unique_together': {('plan', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='plan',
+                    name='volunteers',
+                    field=models.ManyToManyField(related_name='volunteers', through='events.Volunteer', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='volunteer',
+            name='created_on',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='plan',
+            name='volunteer_capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='plan',
+            name='volunteer_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_volunteers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_volunteer_through_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_on', 'id'], name='event_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['upvote_count', 'id'], name='event_upvotes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['updated_on', 'id'], name='event_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['trending_score', 'id'], name='event_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def create_missing_plans(apps, schema_editor):
+    # Events promoted before plans were created with the promotion
+    Event = apps.get_model("events", "Event")
+    Plan = apps.get_model("events", "Plan")
+    Plan.objects.bulk_create([
+        Plan(event_id=pk)
+        for pk in Event.objects.filter(status__in=["PL", "SC"], plan__isnull=True).values_list("pk", flat=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_event_feed_order_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_plans, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,107 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import BooleanField, Count, Exists, F, OuterRef, Q, Subquery, Value
 from django.db.models.deletion import SET_NULL, CASCADE
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from base.page_cache import invalidate_cached_pages
 from userProfile.models import User
+from .signals import status_changed
+from .trending import trending_score
+from collections import namedtuple
 import uuid
 
 
+# Result of EventQuerySet.toggle_upvote. previous_count is the vote count before this toggle was applied.
+UpvoteToggle = namedtuple(
+    "UpvoteToggle", ["upvoted", "upvote_count", "previous_count", "status", "previous_status", "updated_on"]
+)
+# Result of PlanQuerySet.sign_up and withdraw. volunteered is whether the user is a volunteer afterwards, so a
+# sign-up that returns False was turned away because the plan is full.
+VolunteerChange = namedtuple("VolunteerChange", ["volunteered", "volunteer_count", "volunteer_capacity"])
+
+
+class EventQuerySet(models.QuerySet):
+    def for_viewer(self, user):
+        """
+            Annotates each event with what the feed and detail page need for the given viewer in a single query:
+            num_upvotes (read from the stored counter), viewer_upvoted and the joined created_by user.
+        """
+        if user is not None and user.is_authenticated:
+            viewer_upvoted = Exists(
+                Upvote.objects.filter(event_id=OuterRef("pk"), user_id=user.pk)
+            )
+        else:
+            viewer_upvoted = Value(False, output_field=BooleanField())
+
+        return self.select_related("created_by").annotate(
+            num_upvotes=F("upvote_count"),
+            viewer_upvoted=viewer_upvoted,
+        )
+
+    def with_statuses(self, statuses):
+        """
+            Filters to events in any of the given statuses, in a form the keyset feed can read in index order. A
+            single status is an equality on the (status, field, id) indexes. Several statuses are written as a NOT IN
+            of the rest, which the database checks while walking the order-only indexes backwards instead of
+            sorting every matching row.
+        """
+        if len(statuses) == 1:
+            return self.filter(status=statuses[0])
+        return self.exclude(status__in=[status for status in Event.StatusCode.values if status not in statuses])
+
+    def toggle_upvote(self, pk, user):
+        """
+            Adds the user's upvote to the event, or removes it if they already upvoted, without loading the event.
+
+            The vote row is inserted or deleted directly on the through table and the counter is changed by an
+            UPDATE with an F() expression, so concurrent voters can't act on a stale count and edits made to other
+            columns in the meantime are never overwritten. A second, conditional UPDATE runs only for the vote
+            that promotes the event.
+            Returns an UpvoteToggle, or None if the event does not exist.
+        """
+        with transaction.atomic(using=self.db):
+            removed, _ = Upvote.objects.using(self.db).filter(event_id=pk, user_id=user.pk).delete()
+            upvoted = not removed
+            delta = -1 if removed else 1
+
+            if upvoted:
+                try:
+                    with transaction.atomic(using=self.db):
+                        Upvote.objects.using(self.db).create(event_id=pk, user_id=user.pk)
+                except IntegrityError:
+                    # A concurrent request from the same user already added this vote
+                    delta = 0
+
+            changes = {}
+            if removed:
+                # Removed votes leave nothing behind for update_trending to find, so flag the event for rescoring
+                changes["trending_updated_on"] = None
+
+            updated = self.filter(pk=pk).update(**changes, upvote_count=F("upvote_count") + delta)
+            if not updated:
+                transaction.set_rollback(True, using=self.db)
+                return None
+
+            upvote_count, required_num_upvotes, status, updated_on = (
+                self.filter(pk=pk).values_list("upvote_count", "required_num_upvotes", "status", "updated_on").get()
+            )
+            previous_status = status
+
+            # Promote a proposal to planning once it passes the required number of upvotes. The counter UPDATE
+            # above holds the row lock, and the status condition is evaluated against the row being updated, so
+            # only the request that crosses the threshold flips it and reports the transition.
+            if status == Event.StatusCode.PROPOSAL and upvote_count > required_num_upvotes:
+                if self.filter(pk=pk, status=Event.StatusCode.PROPOSAL).update(status=Event.StatusCode.PLANNING):
+                    status = Event.StatusCode.PLANNING
+                    status_changed.send(sender=Event, event_id=pk, old_status=previous_status, new_status=status)
+
+        return UpvoteToggle(upvoted, upvote_count, upvote_count - delta, status, previous_status, updated_on)
+
+
+# On SQLite, triggers on events_event keep the events_event_fts search table in sync (migration 0011). Any change
+# SQLite can't make with ALTER TABLE, such as altering or removing a field, makes Django rebuild the table, which
+# drops them: a migration like that must create them again. TestEventSearch.test_sync_triggers_exist checks them.
 class Event(models.Model):
     class StatusCode(models.TextChoices):
         PROPOSAL = "PR", _("Proposal")
@@ -15,6 +111,18 @@ class Event(models.Model):
         ARCHIVED = "AR", _("Archived")
         DENIED = "DN", _("Denied")
         REMOVED = "RM", _("Removed")
+
+    # Statuses with a Plan: the date poll and volunteer roster on the detail page
+    PLAN_STATUSES = [StatusCode.PLANNING, StatusCode.SCHEDULED]
+
+    # Statuses shown on the proposals feed when no status filter is given
+    FEED_STATUSES = [
+        StatusCode.PROPOSAL,
+        StatusCode.PLANNING,
+        StatusCode.SCHEDULED,
+        StatusCode.COMPLETED,
+        StatusCode.ARCHIVED,
+    ]
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, db_index=True)
     name = models.CharField(max_length=100)
@@ -23,11 +131,41 @@ class Event(models.Model):
     created_by = models.ForeignKey(User, on_delete=SET_NULL, null=True)
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
-    upvotes = models.ManyToManyField(User, related_name="up_votes", blank=True)
+    upvotes = models.ManyToManyField(User, related_name="up_votes", blank=True, through="Upvote")
+    # Denormalized copy of upvotes.count() so list and detail pages never count the join table.
+    # Kept in step by upvoteEvent and release_upvotes, and repaired in bulk by the reconcile_upvotes command.
+    upvote_count = models.PositiveIntegerField(default=0)
+    # Denormalized copy of comment_set.count(), maintained by Comment.save() and decrement_comment_count()
+    comment_count = models.PositiveIntegerField(default=0)
     required_num_upvotes = models.PositiveIntegerField(default=3)
     status = models.CharField(max_length=2, choices=StatusCode.choices, default=StatusCode.PROPOSAL)
+    # Time-decayed vote velocity, precomputed by the update_trending command so the trending feed is a plain
+    # indexed ORDER BY. trending_updated_on is cleared whenever a vote is removed so the next run rescores it.
+    trending_score = models.FloatField(default=0)
+    trending_updated_on = models.DateTimeField(null=True, blank=True)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        # One composite index per feed filter/sort mode so the keyset pages stay index scans. The default feed's
+        # status IN (FEED_STATUSES) can't be read in order from a (status, ...) index, so each sort also has an
+        # order-only index that the feed walks backwards, skipping the few hidden events.
+        indexes = [
+            models.Index(fields=["created_on", "id"], name="event_created_idx"),
+            models.Index(fields=["upvote_count", "id"], name="event_upvotes_idx"),
+            models.Index(fields=["updated_on", "id"], name="event_updated_idx"),
+            models.Index(fields=["trending_score", "id"], name="event_trending_idx"),
+            models.Index(fields=["status", "created_on", "id"], name="event_status_created_idx"),
+            models.Index(fields=["status", "upvote_count", "id"], name="event_status_upvotes_idx"),
+            models.Index(fields=["status", "updated_on", "id"], name="event_status_updated_idx"),
+            models.Index(fields=["status", "trending_score", "id"], name="event_status_trending_idx"),
+            models.Index(fields=["created_by", "created_on", "id"], name="event_creator_created_idx"),
+        ]
 
     def number_of_upvotes(self):
+        # Use the for_viewer() annotation when present instead of counting the join table
+        if hasattr(self, "num_upvotes"):
+            return self.num_upvotes
         return self.upvotes.count()
     
     def set_required_num_upvotes(self, num:int):
@@ -42,21 +180,218 @@ class Event(models.Model):
     def get_absolute_url(self):
         return reverse("eventDetail", kwargs={"pk": self.pk})
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The status as loaded, so save() can tell a status change. None when the status was deferred.
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_status = self.__dict__.get("status")
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        # Score new events as if their creation were a first vote so fresh proposals trend before the next run
+        if adding and not self.trending_score:
+            self.trending_score = trending_score([timezone.now()])
+
+        old_status = getattr(self, "_loaded_status", None)
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if (
+                not adding
+                and old_status is not None
+                and old_status != self.status
+                and (update_fields is None or "status" in update_fields)
+            ):
+                status_changed.send(sender=Event, event_id=self.pk, old_status=old_status, new_status=self.status)
+        self._loaded_status = self.status
+        invalidate_cached_pages()
+
     def __str__(self):
         return self.name
 
 
+def invalidate_deleted_event_pages(**kwargs):
+    # post_delete receiver for Event (see EventsConfig.ready), as deletes never go through Event.save()
+    invalidate_cached_pages()
+
+
+class Upvote(models.Model):
+    # Through model for Event.upvotes. It keeps the auto-created table name so existing votes are preserved.
+    event = models.ForeignKey(Event, on_delete=CASCADE)
+    user = models.ForeignKey(User, on_delete=CASCADE)
+    created_on = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "events_event_upvotes"
+        unique_together = [("event", "user")]
+
+
+def release_upvotes(instance, **kwargs):
+    """
+        pre_delete receiver for User (see EventsConfig.ready). Deleting a user cascades to their Upvote rows
+        without going through EventQuerySet.toggle_upvote, so their events' counters are decremented here, while the
+        rows still exist to find them, and the events are flagged for update_trending to rescore.
+    """
+    Event.objects.filter(upvote__user_id=instance.pk).update(
+        upvote_count=F("upvote_count") - 1, trending_updated_on=None
+    )
+
+
+class PlanQuerySet(models.QuerySet):
+    def refresh_best_dates(self):
+        """
+            Recomputes best_date for every plan in the queryset with a single UPDATE: the proposed date with the
+            most votes, earliest date first on a tie, or None while no date has any votes.
+        """
+        best = (
+            ProposedDate.objects.filter(for_plan_id=OuterRef("pk"))
+            .annotate(num_votes=Count("votes"))
+            .filter(num_votes__gt=0)
+            .order_by("-num_votes", "date", "id")
+            .values("pk")[:1]
+        )
+        return self.update(best_date=Subquery(best))
+
+    def sign_up(self, pk, user):
+        """
+            Adds the user to the plan's volunteers unless the plan is at capacity. The counter is only incremented
+            by an UPDATE conditioned on the count still being below the capacity, so concurrent sign-ups can never
+            overfill the plan. Returns a VolunteerChange, or None if the plan does not exist.
+        """
+        with transaction.atomic(using=self.db):
+            try:
+                with transaction.atomic(using=self.db):
+                    Volunteer.objects.using(self.db).create(plan_id=pk, user_id=user.pk)
+            except IntegrityError:
+                # A concurrent or earlier request already signed the user up
+                volunteered = True
+            else:
+                has_room = Q(volunteer_capacity__isnull=True) | Q(volunteer_count__lt=F("volunteer_capacity"))
+                volunteered = bool(self.filter(has_room, pk=pk).update(volunteer_count=F("volunteer_count") + 1))
+                if not volunteered:
+                    # Full, or no such plan: undo the sign-up
+                    transaction.set_rollback(True, using=self.db)
+
+        return self.volunteer_change(pk, volunteered)
+
+    def withdraw(self, pk, user):
+        # Removes the user from the plan's volunteers. Returns a VolunteerChange, or None if the plan does not exist.
+        with transaction.atomic(using=self.db):
+            removed, _ = Volunteer.objects.using(self.db).filter(plan_id=pk, user_id=user.pk).delete()
+            if removed:
+                self.filter(pk=pk).update(volunteer_count=F("volunteer_count") - 1)
+            return self.volunteer_change(pk, False)
+
+    def volunteer_change(self, pk, volunteered):
+        counts = self.filter(pk=pk).values_list("volunteer_count", "volunteer_capacity").first()
+        return VolunteerChange(volunteered, *counts) if counts else None
+
+
 class Plan(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, db_index=True)
     event = models.OneToOneField(Event, on_delete=CASCADE)
-    volunteers = models.ManyToManyField(User, related_name="volunteers")
+    volunteers = models.ManyToManyField(User, related_name="volunteers", through="Volunteer")
+    # Most volunteers the plan takes, or None for no limit. Enforced by PlanQuerySet.sign_up.
+    volunteer_capacity = models.PositiveIntegerField(null=True, blank=True)
+    # Denormalized copy of volunteers.count(), maintained by PlanQuerySet.sign_up and withdraw, and by
+    # release_volunteer_places when a volunteer's account is deleted
+    volunteer_count = models.PositiveIntegerField(default=0)
+    # Denormalized winner of the date poll, maintained by vote_dates() so pages never tally the votes
+    best_date = models.ForeignKey("ProposedDate", on_delete=SET_NULL, null=True, blank=True, related_name="+")
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
 
+    objects = PlanQuerySet.as_manager()
+
+    def vote_dates(self, user, date_ids):
+        """
+            Makes date_ids the user's full set of votes in this plan's date poll, adding and removing votes in bulk,
+            then refreshes best_date. Ids of dates that belong to other plans are ignored.
+        """
+        DateVote = ProposedDate.votes.through
+        with transaction.atomic():
+            # Lock the plan so concurrent ballots are applied one after another and best_date sees all of them
+            list(Plan.objects.select_for_update().filter(pk=self.pk).values_list("pk"))
+
+            date_ids = set(self.proposeddate_set.filter(pk__in=date_ids).values_list("pk", flat=True))
+            votes = DateVote.objects.filter(proposeddate__for_plan=self, user_id=user.pk)
+            votes.exclude(proposeddate_id__in=date_ids).delete()
+            date_ids -= set(votes.values_list("proposeddate_id", flat=True))
+            DateVote.objects.bulk_create(
+                [DateVote(proposeddate_id=date_id, user_id=user.pk) for date_id in date_ids], ignore_conflicts=True
+            )
+
+            Plan.objects.filter(pk=self.pk).refresh_best_dates()
+            self.best_date_id = Plan.objects.filter(pk=self.pk).values_list("best_date", flat=True).get()
+
+    def is_full(self):
+        return self.volunteer_capacity is not None and self.volunteer_count >= self.volunteer_capacity
+
+    def roster(self):
+        """
+            The plan's volunteers in sign-up order with their users joined in. Each row is annotated with
+            plans_volunteered, the number of plans that user has volunteered for, computed inside the same query.
+        """
+        plans_volunteered = Subquery(
+            Volunteer.objects.filter(user_id=OuterRef("user_id"))
+            .values("user_id")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return (
+            self.volunteer_set.select_related("user")
+            .annotate(plans_volunteered=plans_volunteered)
+            .order_by("created_on", "id")
+        )
+
     def __str__(self):
         return self.event.name
 
 
+class Volunteer(models.Model):
+    # Through model for Plan.volunteers. It keeps the auto-created table name so existing sign-ups are preserved.
+    plan = models.ForeignKey(Plan, on_delete=CASCADE)
+    user = models.ForeignKey(User, on_delete=CASCADE)
+    created_on = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "events_plan_volunteers"
+        unique_together = [("plan", "user")]
+
+
+def create_plan(event_id, new_status, **kwargs):
+    # status_changed receiver (see EventsConfig.ready): an event reaching planning gets the plan its detail page loads
+    if new_status in Event.PLAN_STATUSES:
+        Plan.objects.get_or_create(event_id=event_id)
+
+
+def release_volunteer_places(instance, **kwargs):
+    """
+        pre_delete receiver for User (see EventsConfig.ready). Deleting a user cascades to their Volunteer rows
+        without going through PlanQuerySet.withdraw, so their plans' counters are decremented here, while the rows
+        still exist to find them.
+    """
+    Plan.objects.filter(volunteer__user_id=instance.pk).update(volunteer_count=F("volunteer_count") - 1)
+
+
+class ProposedDateQuerySet(models.QuerySet):
+    def with_vote_counts(self, user=None):
+        # Annotates num_votes and viewer_voted for every date in one grouped query
+        if user is not None and user.is_authenticated:
+            viewer_voted = Exists(
+                ProposedDate.votes.through.objects.filter(proposeddate_id=OuterRef("pk"), user_id=user.pk)
+            )
+        else:
+            viewer_voted = Value(False, output_field=BooleanField())
+
+        return self.annotate(num_votes=Count("votes"), viewer_voted=viewer_voted)
+
+
 class ProposedDate(models.Model):
     # Allow multiple dates to be propsed and the best date voted on for the plan to happen
     id = models.UUIDField(primary_key=True, default=uuid.uuid4)
@@ -65,7 +400,12 @@ class ProposedDate(models.Model):
     date = models.DateField()
     votes = models.ManyToManyField(User, related_name="date_votes")
 
+    objects = ProposedDateQuerySet.as_manager()
+
     def number_of_votes(self):
+        # Use the with_vote_counts() annotation when present instead of counting the join table
+        if hasattr(self, "num_votes"):
+            return self.num_votes
         return self.votes.count()
     
 
@@ -75,5 +415,23 @@ class Comment(models.Model):
     created_by = models.ForeignKey(User, on_delete=CASCADE)
     created_on = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Serves the newest-first keyset pages of an event's comments
+        indexes = [
+            models.Index(fields=["event", "created_on", "id"], name="comment_event_created_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                Event.objects.filter(pk=self.event_id).update(comment_count=F("comment_count") + 1)
+
     def __str__(self):
         return self.comment[:50]
+
+
+def decrement_comment_count(instance, **kwargs):
+    # post_delete receiver (see EventsConfig.ready), so bulk deletes and the cascade from a deleted user count too
+    Event.objects.filter(pk=instance.event_id).update(comment_count=F("comment_count") - 1)
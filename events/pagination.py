@@ -0,0 +1,92 @@
+import base64
+import binascii
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """
+        One page of a keyset (cursor) paginated queryset.
+
+        Unlike OFFSET pagination the database never has to walk the rows before the cursor, so fetching a page
+        deep into the feed costs the same as the first one.
+    """
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def encode_cursor(obj, order_field):
+    value = getattr(obj, order_field)
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+
+    raw = f"{value}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, model, order_field):
+    """
+        Returns the (order value, pk) pair stored in a cursor, or None if the cursor is missing or malformed.
+    """
+    if not cursor:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        value, pk = raw.rsplit("|", 1)
+        value = model._meta.get_field(order_field).to_python(value)
+        pk = model._meta.pk.to_python(pk)
+    except (binascii.Error, UnicodeError, ValueError, ValidationError):
+        return None
+
+    return value, pk
+
+
+def keyset_queryset(queryset, cursor, order_field):
+    # Orders the queryset newest/highest first on (order_field, pk) and skips everything up to the cursor
+    queryset = queryset.order_by(f"-{order_field}", "-pk")
+
+    position = decode_cursor(cursor, queryset.model, order_field)
+    if position is not None:
+        value, pk = position
+        queryset = queryset.filter(
+            Q(**{f"{order_field}__lt": value}) | Q(**{order_field: value, "pk__lt": pk})
+        )
+    return queryset
+
+
+def build_page(object_list, page_size, order_field):
+    # object_list holds up to one row more than the page, which tells whether there is another page without a COUNT
+    next_cursor = None
+    if len(object_list) > page_size:
+        object_list = object_list[:page_size]
+        next_cursor = encode_cursor(object_list[-1], order_field)
+
+    return KeysetPage(object_list, next_cursor)
+
+
+def keyset_paginate(queryset, cursor, page_size, order_field):
+    """
+        Orders the queryset newest/highest first on (order_field, pk) and returns the page after the cursor.
+    """
+    queryset = keyset_queryset(queryset, cursor, order_field)
+    return build_page(list(queryset[:page_size + 1]), page_size, order_field)
+
+
+async def akeyset_paginate(queryset, cursor, page_size, order_field):
+    """
+        keyset_paginate for async views.
+    """
+    queryset = keyset_queryset(queryset, cursor, order_field)
+    return build_page([obj async for obj in queryset[:page_size + 1]], page_size, order_field)
@@ -0,0 +1,81 @@
+import uuid
+
+from django.db import connections
+from django.db.models import BooleanField, Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+
+# Upper bound on results so a vague query can't pull the whole events table into one page
+MAX_RESULTS = 50
+
+# Relative weight of each column in the ranking: name matches first, then location, then description.
+# Mirrored by the setweight() labels in the Postgres search_vector column (A, B, C).
+FTS5_WEIGHTS = {"name": 10.0, "description": 1.0, "location": 5.0}
+
+
+def search_events(queryset, query, limit=MAX_RESULTS):
+    """
+        Full-text search over event name, description and location, best matches first.
+
+        Uses the index built for the database in use by migration 0011: the stored, GIN indexed search_vector
+        column on Postgres and the events_event_fts FTS5 table on SQLite. Any other backend falls back to an
+        icontains scan. Returns a list of events from the given queryset.
+    """
+    query = query.strip()
+    if not query:
+        return []
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        return _search_postgres(queryset, query, limit)
+    if vendor == "sqlite":
+        return _search_sqlite(queryset, query, limit)
+
+    return list(
+        queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query) | Q(location__icontains=query)
+        )[:limit]
+    )
+
+
+def _search_postgres(queryset, query, limit):
+    table = queryset.model._meta.db_table
+    tsquery = "websearch_to_tsquery('english', %s)"
+
+    return list(
+        queryset.filter(
+            RawSQL(f"{table}.search_vector @@ {tsquery}", (query,), output_field=BooleanField())
+        )
+        .annotate(search_rank=RawSQL(f"ts_rank({table}.search_vector, {tsquery})", (query,)))
+        .order_by("-search_rank")[:limit]
+    )
+
+
+def fts5_match_expression(query):
+    # Quote every term so user input is matched literally instead of parsed as FTS5 query syntax
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in query.split()]
+    return " ".join(terms)
+
+
+def _search_sqlite(queryset, query, limit):
+    weights = ", ".join(str(weight) for weight in FTS5_WEIGHTS.values())
+
+    # bm25() only exists inside an FTS5 query, so rank the matches there first and then load the events. The
+    # queryset's own filters are applied in the same query, so events it excludes never take up the limit.
+    ids_sql, ids_params = queryset.order_by().values("pk").query.get_compiler(queryset.db).as_sql()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f"SELECT event_id FROM events_event_fts WHERE events_event_fts MATCH %s AND event_id IN ({ids_sql}) "
+            f"ORDER BY bm25(events_event_fts, 0, {weights}) LIMIT %s",
+            [fts5_match_expression(query), *ids_params, limit],
+        )
+        ranked_ids = [uuid.UUID(event_id) for (event_id,) in cursor.fetchall()]
+
+    if not ranked_ids:
+        return []
+
+    position = Case(
+        *[When(pk=pk, then=Value(i)) for i, pk in enumerate(ranked_ids)],
+        output_field=IntegerField(),
+    )
+    return list(queryset.filter(pk__in=ranked_ids).annotate(search_position=position).order_by("search_position"))
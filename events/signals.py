@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+
+# Sent with event_id, old_status and new_status whenever an existing event's status changes, whether through
+# Event.save() (the edit view, the admin) or EventQuerySet.toggle_upvote promoting it. Sent inside the transaction
+# that makes the change, so anything a receiver writes commits or rolls back with it.
+status_changed = Signal()
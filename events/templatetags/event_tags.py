@@ -10,8 +10,11 @@ def upvoted(event, user):
     """
         Used in an if statement and returns a bool indicating if a user upvoted the filtered event.
         
-        Utilizes the Event model method user_upvoted
+        Reads the viewer_upvoted annotation added by Event.objects.for_viewer() and falls back to the
+        Event model method user_upvoted for un-annotated instances.
     """
+    if hasattr(event, "viewer_upvoted"):
+        return event.viewer_upvoted
     return event.user_upvoted(user)
 
 # register.filter("upvoted", upvoted)
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from ..models import Comment, Event
+from ..views import AsyncProposedEvents
+
+
+@override_settings(ROOT_URLCONF="projectCTW.async_urls")
+class TestAsyncViews(TestCase):
+    password = "testpass123"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "asyncuser",
+            email = "asyncuser@email.com",
+            password = cls.password
+        )
+        cls.events = [
+            Event.objects.create(
+                name = f"asyncevent{i}",
+                description = "async event description",
+                location = "the web",
+                created_by = cls.user,
+            )
+            for i in range(30)
+        ]
+        Comment.objects.create(comment = "an async comment", event = cls.events[0], created_by = cls.user)
+        Event.objects.toggle_upvote(cls.events[0].pk, cls.user)
+
+    async def alogin(self):
+        await self.async_client.alogin(email = self.user.email, password = self.password)
+
+    def test_async_urls_route_to_async_views(self):
+        self.assertIs(resolve(reverse("proposals")).func.view_class, AsyncProposedEvents)
+
+    async def test_proposals(self):
+        await self.alogin()
+        response = await self.async_client.get(reverse("proposals"), {"sort": "votes"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "events/proposed_events.html")
+        self.assertEqual(response.context["events"][0], self.events[0])
+        self.assertTrue(response.context["events"][0].viewer_upvoted)
+        self.assertContains(response, "Loading more events")
+
+    async def test_feed_pages(self):
+        response = await self.async_client.get(reverse("proposals"))
+        cursor = response.context["page_obj"].next_cursor
+
+        response = await self.async_client.get(reverse("proposalsFeed"), {"cursor": cursor})
+        self.assertTemplateUsed(response, "events/partials/event_cards.html")
+        self.assertEqual(len(response.context["events"]), 6)
+        self.assertNotContains(response, "Loading more events")
+
+    async def test_detail(self):
+        await self.alogin()
+        # Site announcements are looked up while rendering, outside the event loop
+        await cache.aclear()
+        response = await self.async_client.get(self.events[0].get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "an async comment")
+        self.assertContains(response, "Edit Event")
+
+    async def test_detail_missing(self):
+        response = await self.async_client.get(reverse("eventDetail", kwargs={"pk": self.user.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_detail_comment_post(self):
+        await self.alogin()
+        response = await self.async_client.post(self.events[1].get_absolute_url(), {"comment": "posted async"})
+        self.assertRedirects(response, self.events[1].get_absolute_url(), fetch_redirect_response=False)
+        self.assertTrue(await Comment.objects.filter(event=self.events[1], comment="posted async").aexists())
+
+    async def test_profile(self):
+        await self.alogin()
+        response = await self.async_client.get(reverse("user_profile", kwargs={"slug": self.user.username}))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.user.username)
+
+        response = await self.async_client.get(reverse("user_profile", kwargs={"slug": "nobody"}))
+        self.assertEqual(response.status_code, 404)
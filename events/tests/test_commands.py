@@ -0,0 +1,111 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Event, Upvote
+
+
+class ReconcileUpvotesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        UserModel = get_user_model()
+        cls.users = [
+            UserModel.objects.create_user(
+                username = f"voter{i}",
+                email = f"voter{i}@email.com",
+                password = "testpass123"
+            )
+            for i in range(3)
+        ]
+
+        cls.event = Event.objects.create(
+            name = "testEvent",
+            description = "testdescription",
+            location = "location",
+            created_by = cls.users[0],
+        )
+        # Adding through the M2M directly bypasses the counter and leaves it drifted
+        cls.event.upvotes.add(*cls.users)
+
+    def test_dry_run_reports_without_writing(self):
+        out = StringIO()
+        call_command("reconcile_upvotes", "--dry-run", stdout=out)
+        self.assertIn("1 event(s)", out.getvalue())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.upvote_count, 0)
+
+    def test_repairs_drifted_count(self):
+        call_command("reconcile_upvotes", stdout=StringIO())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.upvote_count, 3)
+
+        out = StringIO()
+        call_command("reconcile_upvotes", stdout=out)
+        self.assertIn("0 event(s)", out.getvalue())
+
+
+class UpdateTrendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        UserModel = get_user_model()
+        cls.users = [
+            UserModel.objects.create_user(
+                username = f"voter{i}",
+                email = f"voter{i}@email.com",
+                password = "testpass123"
+            )
+            for i in range(3)
+        ]
+        
+        cls.old_event = Event.objects.create(
+            name = "oldEvent", description = "d", location = "l", created_by = cls.users[0],
+        )
+        cls.new_event = Event.objects.create(
+            name = "newEvent", description = "d", location = "l", created_by = cls.users[0],
+        )
+        
+        # Three votes from two days ago lose out to two votes cast just now
+        long_ago = timezone.now() - timedelta(days=2)
+        Event.objects.filter(pk=cls.old_event.pk).update(created_on=long_ago)
+        for user in cls.users:
+            Upvote.objects.create(event=cls.old_event, user=user, created_on=long_ago)
+        for user in cls.users[:2]:
+            Event.objects.toggle_upvote(cls.new_event.pk, user)
+            
+    def test_recent_votes_outrank_old_votes(self):
+        call_command("update_trending", stdout=StringIO())
+        self.old_event.refresh_from_db()
+        self.new_event.refresh_from_db()
+        self.assertGreater(self.new_event.trending_score, self.old_event.trending_score)
+        self.assertIsNotNone(self.old_event.trending_updated_on)
+        
+    def test_incremental_run_only_rescores_events_with_new_votes(self):
+        call_command("update_trending", stdout=StringIO())
+        
+        out = StringIO()
+        call_command("update_trending", stdout=out)
+        self.assertIn("0 event(s)", out.getvalue())
+        
+        Event.objects.toggle_upvote(self.new_event.pk, self.users[2])
+        
+        out = StringIO()
+        call_command("update_trending", stdout=out)
+        self.assertIn("1 event(s)", out.getvalue())
+        
+    def test_removed_vote_flags_event_for_rescoring(self):
+        call_command("update_trending", stdout=StringIO())
+        Event.objects.toggle_upvote(self.new_event.pk, self.users[0])
+        
+        out = StringIO()
+        call_command("update_trending", stdout=out)
+        self.assertIn("1 event(s)", out.getvalue())
+        
+    def test_full_run_rescores_everything(self):
+        call_command("update_trending", stdout=StringIO())
+        out = StringIO()
+        call_command("update_trending", "--full", stdout=out)
+        self.assertIn("2 event(s)", out.getvalue())
@@ -0,0 +1,96 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connection
+from django.test import TransactionTestCase
+
+from ..models import Event, Plan
+
+
+class UpvoteStressTests(TransactionTestCase):
+    """
+        Hammers a single event with upvote toggles from several threads at once. Each thread runs on its own
+        database connection, so this needs a TransactionTestCase rather than TestCase.
+    """
+    num_voters = 8
+    toggles_per_voter = 5
+
+    def setUp(self):
+        # SQLite's shared-cache in-memory test database rejects concurrent writers outright instead of waiting
+        # on them. CI runs the suite on Postgres, where this runs for real.
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Concurrent writes need a file or server backed test database")
+
+        UserModel = get_user_model()
+        self.voters = [
+            UserModel.objects.create_user(
+                username = f"voter{i}",
+                email = f"voter{i}@email.com",
+                password = "testpass123"
+            )
+            for i in range(self.num_voters)
+        ]
+        self.event = Event.objects.create(
+            name = "stressEvent",
+            description = "testdescription",
+            location = "location",
+            created_by = self.voters[0],
+            required_num_upvotes = self.num_voters - 2,
+        )
+
+    def run_threads(self, targets):
+        errors = []
+        start = threading.Barrier(len(targets))
+
+        def worker(target):
+            try:
+                start.wait()
+                target()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+    def toggle(self, user, times):
+        def target():
+            for _ in range(times):
+                Event.objects.toggle_upvote(self.event.pk, user)
+        return target
+
+    def test_concurrent_voters(self):
+        # An odd number of toggles leaves every voter upvoted
+        self.run_threads([self.toggle(voter, self.toggles_per_voter) for voter in self.voters])
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.upvotes.count(), self.num_voters)
+        self.assertEqual(self.event.upvote_count, self.num_voters)
+        self.assertEqual(self.event.status, Event.StatusCode.PLANNING)
+
+    def test_same_voter_concurrent_toggles(self):
+        voter = self.voters[0]
+        self.run_threads([self.toggle(voter, 1) for _ in range(self.num_voters)])
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.upvote_count, self.event.upvotes.count())
+        self.assertEqual(self.event.status, Event.StatusCode.PROPOSAL)
+
+    def test_concurrent_sign_ups_respect_capacity(self):
+        plan = Plan.objects.create(event=self.event, volunteer_capacity=3)
+        results = []
+        self.run_threads([
+            lambda voter=voter: results.append(Plan.objects.sign_up(plan.pk, voter)) for voter in self.voters
+        ])
+
+        plan.refresh_from_db()
+        self.assertEqual(sum(result.volunteered for result in results), 3)
+        self.assertEqual(plan.volunteer_count, 3)
+        self.assertEqual(plan.volunteers.count(), 3)
@@ -0,0 +1,82 @@
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Event
+
+
+# The template settings without the Jinja2 backend, whether or not JINJA2_TEMPLATES is on
+DJANGO_TEMPLATES = [backend for backend in settings.TEMPLATES if backend is not settings.JINJA2_BACKEND]
+
+
+def normalize(html):
+    # The engines differ only in whitespace around their tags. CSRF tokens are masked differently on each render.
+    html = re.sub(r'(csrfmiddlewaretoken" value=|X-CSRFToken": )"[^"]+"', r"\1", html)
+    return re.sub(r"\s+", "", html)
+
+
+@override_settings(TEMPLATES=[settings.JINJA2_BACKEND, *DJANGO_TEMPLATES])
+class Jinja2TemplateTests(TestCase):
+    password = "testpass123"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "jinjauser",
+            email = "jinjauser@email.com",
+            password = cls.password
+        )
+        cls.event = Event.objects.create(
+            name = "jinjaevent",
+            description = "jinja event description",
+            location = "the web",
+            created_by = cls.user,
+            status = Event.StatusCode.PLANNING,
+        )
+        Event.objects.create(name = "otherevent", description = "d", location = "l", created_by = cls.user)
+        Event.objects.toggle_upvote(cls.event.pk, cls.user)
+        Comment.objects.create(event = cls.event, created_by = cls.user, comment = "a jinja comment")
+
+    def setUp(self):
+        cache.clear()
+
+    def get_with_both_engines(self, url):
+        response = self.client.get(url)
+        with override_settings(TEMPLATES=DJANGO_TEMPLATES):
+            django_response = self.client.get(url)
+        return response, django_response
+
+    def assertSameAsDjango(self, url):
+        response, django_response = self.get_with_both_engines(url)
+        self.assertEqual(response.status_code, 200)
+        # Only the Django partials for the layout went through the Django engine
+        self.assertNotIn(django_response.templates[0].name, [template.name for template in response.templates])
+        self.assertEqual(normalize(response.content.decode()), normalize(django_response.content.decode()))
+        return response
+
+    def test_pages_render_the_same_as_django(self):
+        for logged_in in (False, True):
+            if logged_in:
+                self.client.login(email = self.user.email, password = self.password)
+            for url in (reverse("proposals"), reverse("proposalsFeed"), self.event.get_absolute_url()):
+                with self.subTest(url, logged_in=logged_in):
+                    self.assertSameAsDjango(url)
+
+    def test_event_tags(self):
+        self.client.login(email = self.user.email, password = self.password)
+        response = self.client.get(reverse("proposals"))
+        self.assertContains(response, "text-purple-700 border-purple-500 bg-purple-100 badge", count=1)
+        self.assertContains(response, "fa-solid text-teal-600", count=1)
+
+    def test_comment_form(self):
+        self.client.login(email = self.user.email, password = self.password)
+        response = self.client.get(self.event.get_absolute_url())
+        self.assertContains(response, 'name="comment"')
+
+        response = self.client.post(self.event.get_absolute_url(), {"comment": "another comment"})
+        self.assertRedirects(response, self.event.get_absolute_url(), fetch_redirect_response=False)
+        self.assertTrue(Comment.objects.filter(comment = "another comment").exists())
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from ..live import InProcessBroker, event_topic, get_broker
+from ..models import Event
+from ..views import stream_event_updates
+
+
+class InProcessBrokerTests(SimpleTestCase):
+    async def test_publish_reaches_subscribers_of_the_topic(self):
+        broker = InProcessBroker()
+        queue = broker.subscribe(["a", "b"])
+        other = broker.subscribe(["c"])
+
+        broker.publish("b", "hello")
+        self.assertEqual(await asyncio.wait_for(queue.get(), 1), "hello")
+        self.assertTrue(other.empty())
+
+    async def test_publish_from_another_thread(self):
+        broker = InProcessBroker()
+        queue = broker.subscribe(["a"])
+        await asyncio.to_thread(broker.publish, "a", "from a sync view")
+        self.assertEqual(await asyncio.wait_for(queue.get(), 1), "from a sync view")
+
+    async def test_unsubscribe(self):
+        broker = InProcessBroker()
+        queue = broker.subscribe(["a"])
+        broker.unsubscribe(["a"], queue)
+        self.assertEqual(broker.subscribers, {})
+        broker.publish("a", "nobody listening")
+
+
+class EventUpdatesTests(TestCase):
+    password = "testpass123"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "liveuser",
+            email = "liveuser@email.com",
+            password = cls.password
+        )
+        cls.event = Event.objects.create(
+            name = "liveevent",
+            description = "live event description",
+            location = "the web",
+            created_by = cls.user,
+            required_num_upvotes = 0,
+        )
+
+    def test_upvote_publishes_after_commit(self):
+        self.client.login(email = self.user.email, password = self.password)
+        published = []
+        broker = get_broker()
+        original = broker.publish
+        broker.publish = lambda topic, message: published.append((topic, json.loads(message)))
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse("upvote", kwargs={"pk": self.event.pk}))
+        finally:
+            broker.publish = original
+
+        self.assertEqual(published, [(event_topic(self.event.pk), {
+            "id": str(self.event.pk), "upvote_count": 1, "status": "PL", "status_display": "Planning",
+            "status_color": "text-purple-700 border-purple-500 bg-purple-100",
+        })])
+
+    def test_wsgi_sends_current_values_once(self):
+        response = self.client.get(reverse("eventUpdates"), {"ids": f"{self.event.pk},not-a-uuid"})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = response.content.decode()
+        self.assertTrue(content.startswith("retry: 30000\n\n"))
+        self.assertIn(f'"id": "{self.event.pk}", "upvote_count": 0', content)
+
+    def test_no_events_stops_reconnects(self):
+        self.assertEqual(self.client.get(reverse("eventUpdates"), {"ids": "nope"}).status_code, 204)
+
+    async def test_asgi_streams_updates(self):
+        response = await self.async_client.get(reverse("eventUpdates"), {"ids": str(self.event.pk)})
+        self.assertTrue(response.streaming)
+        stream = aiter(response.streaming_content)
+
+        first = (await anext(stream)).decode()
+        self.assertIn('"upvote_count": 0', first)
+
+        get_broker().publish(event_topic(self.event.pk), '{"upvote_count": 7}')
+        update = (await asyncio.wait_for(anext(stream), 1)).decode()
+        self.assertEqual(update, 'event: vote\ndata: {"upvote_count": 7}\n\n')
+
+    async def test_stream_unsubscribes_when_closed(self):
+        broker = InProcessBroker()
+        queue = broker.subscribe(["a"])
+        stream = stream_event_updates(broker, ["a"], queue, [])
+        self.assertEqual(await anext(stream), "retry: 5000\n\n")
+
+        # What the server does when the client disconnects
+        await stream.aclose()
+        self.assertEqual(broker.subscribers, {})
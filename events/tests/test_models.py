@@ -1,7 +1,11 @@
+import uuid
+from datetime import date
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase
 
-from ..models import Event
+from ..models import Event, Plan, ProposedDate, Volunteer
 
 class EventTests(TestCase):
     @classmethod
@@ -28,4 +32,236 @@ class EventTests(TestCase):
         self.assertEqual(self.event.location, "location")
         self.assertEqual(self.event.created_by, self.user)
         self.assertEqual(self.event.upvotes.get(pk=self.user.pk), self.user)
-        self.assertEqual(self.event.upvotes.count(), 1)
\ No newline at end of file
+        self.assertEqual(self.event.upvotes.count(), 1)
+
+class EventQuerySetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        UserModel = get_user_model()
+        cls.voter = UserModel.objects.create_user(
+            username = "voter",
+            email = "voter@email.com",
+            password = "testpass123" 
+        )
+        cls.bystander = UserModel.objects.create_user(
+            username = "bystander",
+            email = "bystander@email.com",
+            password = "testpass123" 
+        )
+        
+        cls.event = Event.objects.create(
+            name = "testEvent",
+            description = "testdescription",
+            location = "location",
+            created_by = cls.voter,
+            upvote_count = 1,
+        )
+        cls.event.upvotes.add(cls.voter)
+        
+    def test_for_viewer_annotations(self):
+        with self.assertNumQueries(1):
+            event = Event.objects.for_viewer(self.voter).get(pk=self.event.pk)
+            self.assertTrue(event.viewer_upvoted)
+            self.assertEqual(event.num_upvotes, 1)
+            self.assertEqual(event.number_of_upvotes(), 1)
+            self.assertEqual(event.created_by.username, "voter")
+        
+        event = Event.objects.for_viewer(self.bystander).get(pk=self.event.pk)
+        self.assertFalse(event.viewer_upvoted)
+        
+    def test_for_viewer_anonymous(self):
+        event = Event.objects.for_viewer(AnonymousUser()).get(pk=self.event.pk)
+        self.assertFalse(event.viewer_upvoted)
+
+        
+class ToggleUpvoteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        UserModel = get_user_model()
+        cls.voters = [
+            UserModel.objects.create_user(
+                username = f"voter{i}",
+                email = f"voter{i}@email.com",
+                password = "testpass123" 
+            )
+            for i in range(3)
+        ]
+        
+        cls.event = Event.objects.create(
+            name = "testEvent",
+            description = "testdescription",
+            location = "location",
+            created_by = cls.voters[0],
+            required_num_upvotes = 2,
+        )
+        
+    def test_toggle(self):
+        result = Event.objects.toggle_upvote(self.event.pk, self.voters[0])
+        self.assertEqual((result.upvoted, result.upvote_count, result.previous_count, result.status), (True, 1, 0, "PR"))
+        self.assertEqual(result.previous_status, "PR")
+        result = Event.objects.toggle_upvote(self.event.pk, self.voters[0])
+        self.assertEqual((result.upvoted, result.upvote_count, result.previous_count, result.status), (False, 0, 1, "PR"))
+        self.assertEqual(self.event.upvotes.count(), 0)
+        
+    def test_missing_event(self):
+        self.assertIsNone(Event.objects.toggle_upvote(uuid.uuid4(), self.voters[0]))
+        
+    def test_promotion_does_not_overwrite_other_columns(self):
+        for voter in self.voters[:-1]:
+            Event.objects.toggle_upvote(self.event.pk, voter)
+        
+        # Simulate an edit saved between loading the event and the promoting vote
+        Event.objects.filter(pk=self.event.pk).update(name="editedEvent")
+        result = Event.objects.toggle_upvote(self.event.pk, self.voters[-1])
+        self.assertEqual((result.upvote_count, result.status, result.previous_status), (3, "PL", "PR"))
+        
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.name, "editedEvent")
+        self.assertEqual(self.event.status, Event.StatusCode.PLANNING)
+
+    def test_only_the_promoting_vote_reports_a_transition(self):
+        results = [Event.objects.toggle_upvote(self.event.pk, voter) for voter in self.voters]
+        self.assertEqual(
+            [(result.previous_status, result.status) for result in results],
+            [("PR", "PR"), ("PR", "PR"), ("PR", "PL")],
+        )
+        # Removing a vote from an event already in planning changes nothing
+        result = Event.objects.toggle_upvote(self.event.pk, self.voters[0])
+        self.assertEqual((result.previous_status, result.status), ("PL", "PL"))
+
+
+class DatePollTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        UserModel = get_user_model()
+        cls.voters = [
+            UserModel.objects.create_user(
+                username = f"datevoter{i}",
+                email = f"datevoter{i}@email.com",
+                password = "testpass123"
+            )
+            for i in range(3)
+        ]
+        event = Event.objects.create(
+            name = "testEvent",
+            description = "testdescription",
+            location = "location",
+            created_by = cls.voters[0],
+        )
+        cls.plan = Plan.objects.create(event=event)
+        cls.dates = [
+            ProposedDate.objects.create(for_plan=cls.plan, created_by=cls.voters[0], date=date(2030, 1, day))
+            for day in (3, 1, 2)
+        ]
+
+    def test_vote_dates_adds_and_removes_in_bulk(self):
+        first, second, third = self.dates
+        self.plan.vote_dates(self.voters[0], [first.pk, second.pk])
+        self.assertEqual(set(self.voters[0].date_votes.all()), {first, second})
+
+        # A fixed number of statements however many dates change
+        with self.assertNumQueries(9):
+            self.plan.vote_dates(self.voters[0], [second.pk, third.pk])
+        self.assertEqual(set(self.voters[0].date_votes.all()), {second, third})
+
+    def test_vote_dates_ignores_other_plans(self):
+        other_plan = Plan.objects.create(event=Event.objects.create(
+            name = "otherEvent", description = "d", location = "l", created_by = self.voters[0],
+        ))
+        other_date = ProposedDate.objects.create(for_plan=other_plan, date=date(2030, 2, 1))
+        self.plan.vote_dates(self.voters[0], [other_date.pk])
+        self.assertFalse(self.voters[0].date_votes.exists())
+
+    def test_best_date_follows_votes(self):
+        self.assertIsNone(self.plan.best_date)
+
+        # A tie goes to the earliest date
+        self.plan.vote_dates(self.voters[0], [self.dates[0].pk])
+        self.plan.vote_dates(self.voters[1], [self.dates[2].pk])
+        self.assertEqual(self.plan.best_date, self.dates[2])
+
+        self.plan.vote_dates(self.voters[2], [self.dates[0].pk])
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).best_date, self.dates[0])
+
+        for voter in self.voters:
+            self.plan.vote_dates(voter, [])
+        self.assertIsNone(Plan.objects.get(pk=self.plan.pk).best_date)
+
+    def test_with_vote_counts(self):
+        self.plan.vote_dates(self.voters[0], [self.dates[0].pk, self.dates[1].pk])
+        self.plan.vote_dates(self.voters[1], [self.dates[0].pk])
+
+        with self.assertNumQueries(1):
+            dates = list(ProposedDate.objects.filter(for_plan=self.plan).with_vote_counts(self.voters[1]).order_by("date"))
+            self.assertEqual([d.number_of_votes() for d in dates], [1, 0, 2])
+            self.assertEqual([d.viewer_voted for d in dates], [False, False, True])
+
+
+class VolunteerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        UserModel = get_user_model()
+        cls.users = [
+            UserModel.objects.create_user(
+                username = f"volunteer{i}",
+                email = f"volunteer{i}@email.com",
+                password = "testpass123"
+            )
+            for i in range(3)
+        ]
+        event = Event.objects.create(
+            name = "testEvent",
+            description = "testdescription",
+            location = "location",
+            created_by = cls.users[0],
+        )
+        cls.plan = Plan.objects.create(event=event, volunteer_capacity=2)
+
+    def test_sign_up_and_withdraw(self):
+        self.assertEqual(Plan.objects.sign_up(self.plan.pk, self.users[0]), (True, 1, 2))
+        # Signing up twice changes nothing
+        self.assertEqual(Plan.objects.sign_up(self.plan.pk, self.users[0]), (True, 1, 2))
+        self.assertEqual(Plan.objects.withdraw(self.plan.pk, self.users[0]), (False, 0, 2))
+        self.assertEqual(Plan.objects.withdraw(self.plan.pk, self.users[0]), (False, 0, 2))
+        self.assertFalse(self.plan.volunteers.exists())
+
+    def test_capacity(self):
+        for user in self.users[:2]:
+            Plan.objects.sign_up(self.plan.pk, user)
+        self.assertEqual(Plan.objects.sign_up(self.plan.pk, self.users[2]), (False, 2, 2))
+        self.assertEqual(self.plan.volunteers.count(), 2)
+
+        Plan.objects.withdraw(self.plan.pk, self.users[0])
+        self.assertEqual(Plan.objects.sign_up(self.plan.pk, self.users[2]), (True, 2, 2))
+
+    def test_deleted_users_free_their_places(self):
+        for user in self.users[:2]:
+            Plan.objects.sign_up(self.plan.pk, user)
+
+        self.users[0].delete()
+        get_user_model().objects.filter(pk=self.users[1].pk).delete()
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).volunteer_count, 0)
+        self.assertEqual(Plan.objects.sign_up(self.plan.pk, self.users[2]), (True, 1, 2))
+
+    def test_unlimited(self):
+        Plan.objects.filter(pk=self.plan.pk).update(volunteer_capacity=None)
+        for user in self.users:
+            self.assertTrue(Plan.objects.sign_up(self.plan.pk, user).volunteered)
+        self.assertFalse(Plan.objects.get(pk=self.plan.pk).is_full())
+
+    def test_missing_plan(self):
+        self.assertIsNone(Plan.objects.sign_up(uuid.uuid4(), self.users[0]))
+        self.assertIsNone(Plan.objects.withdraw(uuid.uuid4(), self.users[0]))
+        self.assertFalse(Volunteer.objects.exists())
+
+    def test_roster(self):
+        other_plan = Plan.objects.create(event=Event.objects.create(
+            name = "otherEvent", description = "d", location = "l", created_by = self.users[0],
+        ))
+        Plan.objects.sign_up(other_plan.pk, self.users[1])
+        for user in self.users[:2]:
+            Plan.objects.sign_up(self.plan.pk, user)
+
+        with self.assertNumQueries(1):
+            roster = [(v.user.username, v.plans_volunteered) for v in self.plan.roster()]
+        self.assertEqual(roster, [("volunteer0", 1), ("volunteer1", 2)])
@@ -1,8 +1,20 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 from django.contrib.auth import get_user_model, get_user
 from django.urls import reverse
+from django.utils import timezone
+
+from base.tests.query_budget import QueryBudgetMixin
 
-from ..models import Event
+from ..models import Comment, Event, Plan, ProposedDate
+from ..search import MAX_RESULTS
+from ..views import COMMENTS_PAGE_SIZE, ProposedEvents
 
 class TestProposals(TestCase):
     password = "testpass123"
@@ -59,4 +71,591 @@ class TestProposals(TestCase):
         self.assertContains(self.response, "0 Up Votes")
         
         
-        
\ No newline at end of file
+        
+        
+    def test_proposal_upvote_updates_stored_count(self):
+        self.client.login(
+            email = self.test_user2.email, 
+            password = self.password,
+        )
+        
+        self.client.post(reverse("upvote", kwargs={'pk':self.test_event.id}))
+        self.test_event.refresh_from_db()
+        self.assertEqual(self.test_event.upvote_count, 1)
+        
+        self.client.post(reverse("upvote", kwargs={'pk':self.test_event.id}))
+        self.test_event.refresh_from_db()
+        self.assertEqual(self.test_event.upvote_count, 0)
+
+        
+    def test_proposal_queries_do_not_grow_with_events(self):
+        self.client.login(
+            email = self.test_user2.email, 
+            password = self.password,
+        )
+        # Warm the session and user lookups so only the feed itself is measured
+        self.client.get(self.url)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+        
+        for i in range(5):
+            event = Event.objects.create(
+                name = f"extra{i}",
+                description = "more events",
+                location = "the web",
+                created_by = self.test_user1,
+            )
+            event.upvotes.add(self.test_user2)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+
+class TestProposalsPagination(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "testuser1",
+            email = "testuser1@email.com",
+            password = "testpass123"
+        )
+        
+        # One more event than a single page holds
+        cls.page_size = ProposedEvents.paginate_by
+        for i in range(cls.page_size + 1):
+            Event.objects.create(
+                name = f"event{i:03}",
+                description = "paginated event",
+                location = "the web",
+                created_by = cls.user,
+            )
+            
+    def test_first_page_is_capped(self):
+        response = self.client.get(reverse("proposals"))
+        self.assertEqual(len(response.context["events"]), self.page_size)
+        self.assertTrue(response.context["page_obj"].has_next())
+        self.assertContains(response, reverse("proposalsFeed"))
+        
+    def test_feed_returns_remaining_cards(self):
+        response = self.client.get(reverse("proposals"))
+        first_page = {event.pk for event in response.context["events"]}
+        
+        response = self.client.get(reverse("proposalsFeed"), {"cursor": response.context["page_obj"].next_cursor})
+        self.assertTemplateUsed(response, "events/partials/event_cards.html")
+        self.assertTemplateNotUsed(response, "base.html")
+        self.assertEqual(len(response.context["events"]), 1)
+        self.assertNotIn(response.context["events"][0].pk, first_page)
+        self.assertFalse(response.context["page_obj"].has_next())
+        
+    def test_invalid_cursor_starts_from_the_top(self):
+        response = self.client.get(reverse("proposalsFeed"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["events"]), self.page_size)
+
+
+class TestProposalsFilters(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        UserModel = get_user_model()
+        cls.user1 = UserModel.objects.create_user(
+            username = "testuser1",
+            email = "testuser1@email.com",
+            password = "testpass123"
+        )
+        cls.user2 = UserModel.objects.create_user(
+            username = "testuser2",
+            email = "testuser2@email.com",
+            password = "testpass123"
+        )
+        
+        cls.proposal = Event.objects.create(
+            name = "proposal", description = "d", location = "l", created_by = cls.user1, upvote_count = 1,
+        )
+        cls.planning = Event.objects.create(
+            name = "planning", description = "d", location = "l", created_by = cls.user2, upvote_count = 5,
+            status = Event.StatusCode.PLANNING,
+        )
+        cls.denied = Event.objects.create(
+            name = "denied", description = "d", location = "l", created_by = cls.user1,
+            status = Event.StatusCode.DENIED,
+        )
+        
+    def get_names(self, **params):
+        response = self.client.get(reverse("proposals"), params)
+        return [event.name for event in response.context["events"]]
+        
+    def test_default_hides_denied_and_removed(self):
+        self.assertCountEqual(self.get_names(), ["proposal", "planning"])
+        
+    def test_status_filter(self):
+        self.assertEqual(self.get_names(status="PL"), ["planning"])
+        self.assertEqual(self.get_names(status="DN"), ["denied"])
+        
+    def test_several_statuses(self):
+        self.assertCountEqual(self.get_names(status=["PR", "DN"]), ["proposal", "denied"])
+
+    @skipUnless(connection.vendor == "sqlite", "Reads SQLite's query plan")
+    def test_feed_reads_in_index_order(self):
+        for statuses in (Event.FEED_STATUSES, ["PL"]):
+            for order_field in ProposedEvents.sort_fields.values():
+                with self.subTest(statuses=statuses, order_field=order_field):
+                    queryset = Event.objects.with_statuses(statuses).order_by(f"-{order_field}", "-pk")
+                    self.assertNotIn("TEMP B-TREE", str(queryset[:25].explain()))
+
+    def test_creator_filter(self):
+        self.assertEqual(self.get_names(creator="testuser1"), ["proposal"])
+        
+    def test_sort_by_votes(self):
+        self.assertEqual(self.get_names(sort="votes"), ["planning", "proposal"])
+        
+    def test_sort_by_updated(self):
+        self.proposal.save()
+        self.assertEqual(self.get_names(sort="updated"), ["proposal", "planning"])
+        
+    def test_sort_by_trending(self):
+        Event.objects.filter(pk=self.proposal.pk).update(trending_score=self.planning.trending_score + 1)
+        self.assertEqual(self.get_names(sort="trending"), ["proposal", "planning"])
+        
+    def test_filters_carried_to_feed(self):
+        response = self.client.get(reverse("proposals"), {"status": "PL", "sort": "votes"})
+        self.assertEqual(response.context["feed_query"], "status=PL&sort=votes")
+
+
+class TestEventFragmentCache(TestCase):
+    password = "testpass123"
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "testuser1",
+            email = "testuser1@email.com",
+            password = cls.password
+        )
+        cls.event = Event.objects.create(
+            name = "cachedevent",
+            description = "cached description",
+            location = "the web",
+            created_by = cls.user,
+        )
+        
+    def setUp(self):
+        cache.clear()
+        self.client.login(email = self.user.email, password = self.password)
+        
+    def fragment_key(self, name, event):
+        return make_template_fragment_key(name, [event.pk, event.updated_on, event.upvote_count, event.status])
+        
+    def test_card_and_sidebar_are_cached(self):
+        self.client.get(reverse("proposals"))
+        self.assertIsNotNone(cache.get(self.fragment_key("event_card", self.event)))
+        
+        self.client.get(self.event.get_absolute_url())
+        self.assertIsNotNone(cache.get(self.fragment_key("event_sidebar", self.event)))
+        
+    def test_upvote_invalidates_fragments(self):
+        self.client.get(reverse("proposals"))
+        self.client.get(self.event.get_absolute_url())
+        
+        self.client.post(reverse("upvote", kwargs={'pk':self.event.id}))
+        self.assertIsNone(cache.get(self.fragment_key("event_card", self.event)))
+        self.assertIsNone(cache.get(self.fragment_key("event_sidebar", self.event)))
+        
+        # The viewer's thumb state is rendered outside the cached fragment
+        response = self.client.get(reverse("proposals"))
+        self.assertContains(response, "fa-solid text-teal-600")
+        
+    def test_status_changes_miss_the_cache(self):
+        self.client.get(reverse("proposals"))
+        self.client.get(self.event.get_absolute_url())
+
+        # As a promotion by another process would, leaving updated_on and this process's cache alone
+        Event.objects.filter(pk=self.event.pk).update(status=Event.StatusCode.PLANNING)
+        planning = "text-purple-700 border-purple-500 bg-purple-100"
+        self.assertContains(self.client.get(reverse("proposals")), planning)
+        self.assertContains(self.client.get(self.event.get_absolute_url()), planning)
+
+    def test_edit_invalidates_fragments(self):
+        self.client.get(reverse("proposals"))
+        
+        self.client.post(
+            reverse("editEvent", kwargs={'pk':self.event.id}),
+            {"name": "renamed", "description": "new description", "location": "the web"},
+        )
+        self.assertIsNone(cache.get(self.fragment_key("event_card", self.event)))
+        self.assertContains(self.client.get(reverse("proposals")), "new description")
+        
+    def test_comment_invalidates_fragments(self):
+        self.client.get(self.event.get_absolute_url())
+        
+        self.client.post(self.event.get_absolute_url(), {"comment": "nice"})
+        self.assertIsNone(cache.get(self.fragment_key("event_sidebar", self.event)))
+
+
+class TestEventComments(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        UserModel = get_user_model()
+        cls.users = [
+            UserModel.objects.create_user(
+                username = f"commenter{i}",
+                email = f"commenter{i}@email.com",
+                password = "testpass123"
+            )
+            for i in range(3)
+        ]
+        cls.event = Event.objects.create(
+            name = "discussedevent",
+            description = "lots of comments",
+            location = "the web",
+            created_by = cls.users[0],
+        )
+        for i in range(COMMENTS_PAGE_SIZE + 5):
+            Comment.objects.create(comment = f"comment {i:03}", event = cls.event, created_by = cls.users[i % 3])
+            
+    def test_comment_count_is_stored(self):
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.comment_count, COMMENTS_PAGE_SIZE + 5)
+        
+        Comment.objects.filter(event = self.event).first().delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.comment_count, COMMENTS_PAGE_SIZE + 4)
+
+    def test_comment_count_follows_bulk_deletes(self):
+        Comment.objects.filter(event = self.event, created_by = self.users[1]).delete()
+        self.users[2].delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.comment_count, Comment.objects.filter(event = self.event).count())
+        self.assertEqual(self.event.comment_count, (COMMENTS_PAGE_SIZE + 5 + 2) // 3)
+
+    def test_upvote_count_follows_deleted_users(self):
+        for user in self.users[1:]:
+            Event.objects.toggle_upvote(self.event.pk, user)
+        Event.objects.filter(pk = self.event.pk).update(trending_updated_on = timezone.now())
+
+        self.users[1].delete()
+        get_user_model().objects.filter(pk = self.users[2].pk).delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.upvote_count, self.event.upvotes.count())
+        self.assertEqual(self.event.upvote_count, 0)
+        # Flagged for update_trending to rescore
+        self.assertIsNone(self.event.trending_updated_on)
+        
+    def test_detail_shows_newest_page(self):
+        response = self.client.get(self.event.get_absolute_url())
+        comments = response.context["comments"]
+        self.assertEqual(len(comments), COMMENTS_PAGE_SIZE)
+        self.assertEqual(comments.object_list[0].comment, f"comment {COMMENTS_PAGE_SIZE + 4:03}")
+        self.assertContains(response, f"({COMMENTS_PAGE_SIZE + 5})")
+        self.assertContains(response, "Load older comments")
+        
+    def test_comment_queries_do_not_grow_with_authors(self):
+        # Event, comments with their authors; nothing per comment
+        with self.assertNumQueries(2):
+            self.client.get(self.event.get_absolute_url())
+        
+    def test_load_older_comments(self):
+        response = self.client.get(self.event.get_absolute_url())
+        cursor = response.context["comments"].next_cursor
+        
+        response = self.client.get(reverse("eventComments", kwargs={"pk": self.event.pk}), {"cursor": cursor})
+        self.assertTemplateUsed(response, "events/partials/comments.html")
+        self.assertEqual(
+            [comment.comment for comment in response.context["comments"]],
+            [f"comment {i:03}" for i in reversed(range(5))],
+        )
+        self.assertNotContains(response, "Load older comments")
+
+
+class TestEventSearch(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "testuser1",
+            email = "testuser1@email.com",
+            password = "testpass123"
+        )
+        cls.park = Event.objects.create(
+            name = "Park cleanup",
+            description = "Pick up litter along the river trail",
+            location = "Memorial Park",
+            created_by = cls.user,
+        )
+        cls.garden = Event.objects.create(
+            name = "Community garden",
+            description = "Build raised beds next to the park entrance",
+            location = "Downtown",
+            created_by = cls.user,
+        )
+        cls.removed = Event.objects.create(
+            name = "Removed park event",
+            description = "Should never show up",
+            location = "Nowhere",
+            created_by = cls.user,
+            status = Event.StatusCode.REMOVED,
+        )
+        
+    def search(self, query, **headers):
+        return self.client.get(reverse("searchEvents"), {"q": query}, headers=headers)
+        
+    def test_ranked_results(self):
+        response = self.search("park")
+        self.assertTemplateUsed(response, "events/search_results.html")
+        self.assertEqual(list(response.context["events"]), [self.park, self.garden])
+        
+    def test_stemmed_match(self):
+        response = self.search("trails")
+        self.assertEqual(list(response.context["events"]), [self.park])
+        
+    def test_index_follows_edits(self):
+        Event.objects.filter(pk=self.garden.pk).update(name="Orchard planting")
+        self.assertEqual(list(self.search("orchard").context["events"]), [self.garden])
+        
+        self.park.delete()
+        self.assertEqual(list(self.search("litter").context["events"]), [])
+        
+    @skipUnless(connection.vendor == "sqlite", "Checks SQLite's FTS5 sync triggers")
+    def test_sync_triggers_exist(self):
+        # Dropped whenever a migration makes SQLite rebuild events_event, leaving the search index to go stale
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'events_event'")
+            triggers = {name for (name,) in cursor.fetchall()}
+        self.assertLessEqual(
+            {"events_event_fts_insert", "events_event_fts_update", "events_event_fts_delete"}, triggers
+        )
+
+    def test_hidden_matches_do_not_use_up_the_results(self):
+        Event.objects.bulk_create([
+            Event(name = f"Garden {i}", description = "d", location = "l", status = Event.StatusCode.REMOVED)
+            for i in range(MAX_RESULTS + 1)
+        ])
+        self.assertEqual(list(self.search("garden").context["events"]), [self.garden])
+
+    def test_query_syntax_is_escaped(self):
+        response = self.search('park" OR "')
+        self.assertEqual(response.status_code, 200)
+        
+    def test_htmx_returns_cards_only(self):
+        response = self.search("garden", HX_Request="true")
+        self.assertTemplateUsed(response, "events/partials/event_cards.html")
+        self.assertTemplateNotUsed(response, "base.html")
+        self.assertContains(response, "Community garden")
+
+
+class TestDatePoll(TestCase):
+    password = "testpass123"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "polluser",
+            email = "polluser@email.com",
+            password = cls.password
+        )
+        cls.event = Event.objects.create(
+            name = "pollevent",
+            description = "poll event description",
+            location = "the web",
+            created_by = cls.user,
+            status = Event.StatusCode.PLANNING,
+        )
+        cls.plan = Plan.objects.create(event=cls.event)
+        cls.dates = [
+            ProposedDate.objects.create(for_plan=cls.plan, date=f"2030-01-0{day}") for day in (1, 2)
+        ]
+        cls.url = reverse("planDates", kwargs={"pk": cls.event.pk})
+
+    def test_detail_loads_poll(self):
+        self.assertContains(self.client.get(self.event.get_absolute_url()), self.url)
+
+    def test_promoted_event_gets_a_poll(self):
+        event = Event.objects.create(
+            name = "promoted", description = "d", location = "l", created_by = self.user, required_num_upvotes = 0,
+        )
+        Event.objects.toggle_upvote(event.pk, self.user)
+
+        url = reverse("planDates", kwargs={"pk": event.pk})
+        self.assertContains(self.client.get(event.get_absolute_url()), url)
+        self.assertContains(self.client.get(url), "No dates have been proposed yet.")
+
+    def test_detail_without_plan(self):
+        # Created straight into planning, so no status change made it a plan
+        event = Event.objects.create(
+            name = "noplan", description = "d", location = "l", created_by = self.user,
+            status = Event.StatusCode.PLANNING,
+        )
+        self.assertNotContains(self.client.get(event.get_absolute_url()), reverse("planDates", kwargs={"pk": event.pk}))
+
+    def test_poll(self):
+        response = self.client.get(self.url)
+        self.assertTemplateUsed(response, "events/partials/date_poll.html")
+        self.assertContains(response, "0 votes", count=2)
+        self.assertContains(response, "to vote on dates")
+
+    def test_vote_batch(self):
+        self.client.login(email = self.user.email, password = self.password)
+        response = self.client.post(
+            self.url, {"dates": [str(self.dates[0].pk), str(self.dates[1].pk), "not-a-uuid"]}, HTTP_HX_REQUEST="true"
+        )
+        self.assertContains(response, "1 vote", count=2)
+        self.assertContains(response, "Leading date: <span class=\"font-semibold text-teal-700\">January 01, 2030")
+
+        response = self.client.post(self.url, {"dates": [str(self.dates[1].pk)]})
+        self.assertRedirects(response, self.event.get_absolute_url())
+        self.assertEqual(list(self.user.date_votes.all()), [self.dates[1]])
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).best_date, self.dates[1])
+
+    def test_vote_requires_login(self):
+        response = self.client.post(self.url, {"dates": [str(self.dates[0].pk)]})
+        self.assertRedirects(response, reverse("account_login"))
+        self.assertFalse(self.user.date_votes.exists())
+
+    def test_event_without_plan(self):
+        other = Event.objects.create(name = "noplan", description = "d", location = "l", created_by = self.user)
+        self.assertEqual(self.client.get(reverse("planDates", kwargs={"pk": other.pk})).status_code, 404)
+
+
+class TestVolunteers(TestCase):
+    password = "testpass123"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "volunteeruser",
+            email = "volunteeruser@email.com",
+            password = cls.password
+        )
+        cls.event = Event.objects.create(
+            name = "volunteerevent",
+            description = "volunteer event description",
+            location = "the web",
+            created_by = cls.user,
+            status = Event.StatusCode.PLANNING,
+        )
+        cls.plan = Plan.objects.create(event=cls.event, volunteer_capacity=1)
+        cls.kwargs = {"pk": cls.event.pk}
+
+    def test_detail_loads_roster(self):
+        self.assertContains(self.client.get(self.event.get_absolute_url()), reverse("planVolunteers", kwargs=self.kwargs))
+
+    def test_promoted_event_takes_volunteers(self):
+        event = Event.objects.create(
+            name = "promoted", description = "d", location = "l", created_by = self.user, required_num_upvotes = 0,
+        )
+        self.assertEqual(Event.objects.toggle_upvote(event.pk, self.user).status, Event.StatusCode.PLANNING)
+
+        kwargs = {"pk": event.pk}
+        self.assertContains(self.client.get(event.get_absolute_url()), reverse("planVolunteers", kwargs=kwargs))
+        self.assertContains(self.client.get(reverse("planVolunteers", kwargs=kwargs)), "Volunteers")
+
+        self.client.login(email = self.user.email, password = self.password)
+        response = self.client.post(reverse("volunteerSignUp", kwargs=kwargs), HTTP_HX_REQUEST="true")
+        self.assertContains(response, "Withdraw")
+
+    def test_sign_up_and_withdraw(self):
+        self.client.login(email = self.user.email, password = self.password)
+        response = self.client.post(reverse("volunteerSignUp", kwargs=self.kwargs), HTTP_HX_REQUEST="true")
+        self.assertContains(response, "1 of 1 signed up")
+        self.assertContains(response, "Withdraw")
+
+        response = self.client.post(reverse("volunteerWithdraw", kwargs=self.kwargs))
+        self.assertRedirects(response, self.event.get_absolute_url())
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).volunteer_count, 0)
+
+    def test_full_plan(self):
+        other = get_user_model().objects.create_user(username = "other", email = "other@email.com", password = "x")
+        Plan.objects.sign_up(self.plan.pk, other)
+
+        self.client.login(email = self.user.email, password = self.password)
+        response = self.client.post(reverse("volunteerSignUp", kwargs=self.kwargs), HTTP_HX_REQUEST="true")
+        self.assertContains(response, "all the volunteers it needs")
+        self.assertNotContains(response, ">Volunteer</button>")
+        self.assertFalse(self.plan.volunteers.filter(pk=self.user.pk).exists())
+
+    def test_requires_login_and_post(self):
+        response = self.client.post(reverse("volunteerSignUp", kwargs=self.kwargs))
+        self.assertRedirects(response, f"{reverse('account_login')}?next={reverse('volunteerSignUp', kwargs=self.kwargs)}")
+        self.assertEqual(self.client.get(reverse("volunteerSignUp", kwargs=self.kwargs)).status_code, 405)
+
+
+class TestEventQueryBudgets(QueryBudgetMixin, TestCase):
+    password = "testpass123"
+    
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_data", users=10, events=5, plan_ratio=0.5, seed=1, stdout=StringIO())
+        cls.user = get_user_model().objects.create_user(
+            username = "budgetuser",
+            email = "budgetuser@email.com",
+            password = cls.password
+        )
+        cls.event = Event.objects.create(
+            name = "budgetevent",
+            description = "budget event description",
+            location = "the web",
+            created_by = cls.user,
+        )
+        
+    def setUp(self):
+        self.client.login(email = self.user.email, password = self.password)
+        
+    def seed_events(self):
+        call_command("seed_data", users=10, events=20, plan_ratio=0.5, seed=2, stdout=StringIO())
+        
+    def add_comments_and_voters(self):
+        for user in get_user_model().objects.exclude(pk=self.user.pk)[:10]:
+            Event.objects.toggle_upvote(self.event.pk, user)
+            Comment.objects.create(comment = "another comment", event = self.event, created_by = user)
+        
+    # Full pages include one query for the site announcements, and for a logged in user one for the navbar's
+    # unread notification count. The budget helper always measures them with a cold cache.
+    def test_proposals(self):
+        self.assertQueriesDoNotGrow(lambda: self.client.get(reverse("proposals")), self.seed_events, budget=5)
+        
+    def test_proposals_anonymous(self):
+        self.client.logout()
+        self.assertQueriesDoNotGrow(lambda: self.client.get(reverse("proposals")), self.seed_events, budget=2)
+        
+    def test_proposals_feed(self):
+        self.assertQueriesDoNotGrow(
+            lambda: self.client.get(reverse("proposalsFeed"), {"sort": "votes"}), self.seed_events, budget=3
+        )
+        
+    def test_search(self):
+        self.assertQueriesDoNotGrow(
+            lambda: self.client.get(reverse("searchEvents"), {"q": "event"}), self.seed_events, budget=6
+        )
+        
+    def test_detail(self):
+        self.assertQueriesDoNotGrow(
+            lambda: self.client.get(self.event.get_absolute_url()), self.add_comments_and_voters, budget=6
+        )
+        
+    def test_older_comments(self):
+        self.assertQueriesDoNotGrow(
+            lambda: self.client.get(reverse("eventComments", kwargs={"pk": self.event.pk})),
+            self.add_comments_and_voters,
+            budget=4,
+        )
+
+    def test_date_poll(self):
+        plan = Plan.objects.create(event=self.event)
+
+        def add_dates_and_votes():
+            for day in range(1, 6):
+                proposed_date = ProposedDate.objects.create(for_plan=plan, date=f"2030-01-0{day}")
+                proposed_date.votes.add(*get_user_model().objects.all()[:day])
+            plan.vote_dates(self.user, plan.proposeddate_set.values_list("pk", flat=True))
+
+        self.assertQueriesDoNotGrow(
+            lambda: self.client.get(reverse("planDates", kwargs={"pk": self.event.pk})), add_dates_and_votes, budget=4
+        )
+
+    def test_volunteer_roster(self):
+        plan = Plan.objects.create(event=self.event)
+
+        def add_volunteers():
+            for user in get_user_model().objects.all()[:10]:
+                Plan.objects.sign_up(plan.pk, user)
+
+        self.assertQueriesDoNotGrow(
+            lambda: self.client.get(reverse("planVolunteers", kwargs={"pk": self.event.pk})), add_volunteers, budget=4
+        )
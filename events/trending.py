@@ -0,0 +1,34 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+
+# How long it takes for a vote to count half as much towards an event's trending score
+HALF_LIFE = timedelta(hours=12)
+
+# Fixed reference point so scores computed on different runs are comparable
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def vote_weight(timestamp):
+    """
+        Log2 weight of a single vote, measured in half-lives since EPOCH.
+
+        A vote one half-life newer than another is worth twice as much, which is the same ordering as decaying
+        every vote by half per HALF_LIFE from "now" - except the score of an event with no new votes never
+        has to be recomputed as time passes.
+    """
+    return (timestamp - EPOCH) / HALF_LIFE
+
+
+def trending_score(timestamps):
+    """
+        Combines vote timestamps into one score: log2 of the sum of 2 ** vote_weight(t).
+
+        Uses the log-sum-exp trick so the large exponents never overflow.
+    """
+    weights = [vote_weight(timestamp) for timestamp in timestamps]
+    if not weights:
+        return 0.0
+
+    peak = max(weights)
+    return peak + math.log2(sum(2 ** (weight - peak) for weight in weights))
@@ -3,8 +3,16 @@ from . import views
 
 urlpatterns = [
     path("", views.proposedEvents, name="proposals"),
+    path("feed/", views.proposedEventsFeed, name="proposalsFeed"),
+    path("search/", views.searchEvents, name="searchEvents"),
     path("create/", views.createEvent, name="createEvent"),
     path("detail/<uuid:pk>/", views.detailView, name="eventDetail"),
+    path("detail/<uuid:pk>/comments/", views.eventComments, name="eventComments"),
     path("edit/<uuid:pk>/", views.editEvent, name="editEvent"),
-    path("upvote/<str:pk>/", views.upvoteEvent, name="upvote"),
+    path("detail/<uuid:pk>/dates/", views.planDates, name="planDates"),
+    path("detail/<uuid:pk>/volunteers/", views.planVolunteers, name="planVolunteers"),
+    path("detail/<uuid:pk>/volunteers/join/", views.volunteerSignUp, name="volunteerSignUp"),
+    path("detail/<uuid:pk>/volunteers/withdraw/", views.volunteerWithdraw, name="volunteerWithdraw"),
+    path("upvote/<uuid:pk>/", views.upvoteEvent, name="upvote"),
+    path("updates/", views.eventUpdates, name="eventUpdates"),
 ]
@@ -1,21 +1,145 @@
-from django.http import HttpResponse
+import asyncio
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.response import TemplateResponse
 
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.views.decorators.http import require_POST
 from django.views.generic import DetailView, ListView
 
+from .cache import invalidate_event_fragments
 from .forms import EventForm, CommentForm
-from .models import Event, Comment
-from django.contrib.auth.decorators import login_required
+from .live import event_topic, event_update_message, get_broker, publish_event_update, sse_message
+from .models import Event, Comment, Plan
+from .pagination import akeyset_paginate, keyset_paginate
+from .search import search_events
+from base.page_cache import cache_anonymous_page, invalidate_cached_pages
+from base.replicas import read_from_replica
+from notifications.context_processors import aunread_notifications
 
 
+COMMENTS_PAGE_SIZE = 20
+# Most events one live update connection may watch, and seconds between keepalives on an idle one
+LIVE_UPDATES_MAX_EVENTS = 100
+LIVE_UPDATES_KEEPALIVE = 15
+
 
 class ProposedEvents(ListView):
     model = Event
     template_name = "events/proposed_events.html"
     context_object_name = "events"
+    paginate_by = 24
+
+    # Query string sort value -> field the feed is keyset paginated on. Each has a matching index in Event.Meta.
+    sort_fields = {
+        "newest": "created_on",
+        "votes": "upvote_count",
+        "updated": "updated_on",
+        "trending": "trending_score",
+    }
+    default_sort = "newest"
+
+    def get_sort(self):
+        sort = self.request.GET.get("sort")
+        return sort if sort in self.sort_fields else self.default_sort
+
+    def get_statuses(self):
+        statuses = [status for status in self.request.GET.getlist("status") if status in Event.StatusCode.values]
+        return statuses or Event.FEED_STATUSES
+
+    def get_queryset(self):
+        queryset = Event.objects.for_viewer(self.request.user).with_statuses(self.get_statuses())
+
+        creator = self.request.GET.get("creator")
+        if creator:
+            queryset = queryset.filter(created_by__username=creator)
+
+        return queryset
+
+    def paginate_queryset(self, queryset, page_size):
+        # Keyset pagination in place of ListView's OFFSET based Paginator
+        order_field = self.sort_fields[self.get_sort()]
+        page = keyset_paginate(queryset, self.request.GET.get("cursor"), page_size, order_field)
+        return (None, page, page.object_list, page.has_next())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_feed_context())
+        return context
+
+    def get_feed_context(self):
+        # Carry the active filters over to the infinite scroll requests
+        feed_query = self.request.GET.copy()
+        feed_query.pop("cursor", None)
+
+        return {
+            "feed_query": feed_query.urlencode(),
+            "sort": self.get_sort(),
+            "sort_choices": [("newest", "Newest"), ("votes", "Most votes"), ("updated", "Recently updated"), ("trending", "Trending")],
+            "selected_statuses": self.request.GET.getlist("status"),
+            "status_choices": Event.StatusCode.choices,
+            "creator": self.request.GET.get("creator", ""),
+        }
     
-proposedEvents = ProposedEvents.as_view()
+proposedEvents = cache_anonymous_page(read_from_replica(ProposedEvents.as_view()))
+
+
+class ProposedEventsFeed(ProposedEvents):
+    # Returns only the next batch of <li> cards for the htmx infinite scroll on the proposals page
+    template_name = "events/partials/event_cards.html"
+
+proposedEventsFeed = cache_anonymous_page(read_from_replica(ProposedEventsFeed.as_view()))
+
+
+class AsyncProposedEvents(ProposedEvents):
+    """
+        ProposedEvents for ASGI deployments (see projectCTW/async_urls.py): the page is read through the async ORM
+        so no thread is held while the database works.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        # The lazy request.user can only load synchronously, so load it before the template asks
+        request.user = await request.auser()
+
+        self.object_list = self.get_queryset()
+        page = await akeyset_paginate(
+            self.object_list, request.GET.get("cursor"), self.paginate_by, self.sort_fields[self.get_sort()]
+        )
+        context = {
+            "view": self,
+            "paginator": None,
+            "page_obj": page,
+            "is_paginated": page.has_next(),
+            "object_list": page.object_list,
+            self.context_object_name: page.object_list,
+            **self.get_feed_context(),
+            **await aunread_notifications(request),
+        }
+        return self.render_to_response(context)
+
+asyncProposedEvents = cache_anonymous_page(read_from_replica(AsyncProposedEvents.as_view()))
+
+
+class AsyncProposedEventsFeed(AsyncProposedEvents):
+    template_name = ProposedEventsFeed.template_name
+
+asyncProposedEventsFeed = cache_anonymous_page(read_from_replica(AsyncProposedEventsFeed.as_view()))
+
+
+def searchEvents(request):
+    query = request.GET.get("q", "").strip()
+    events = search_events(Event.objects.for_viewer(request.user).filter(status__in=Event.FEED_STATUSES), query)
+    context = {"events": events, "query": query}
+
+    # The search box live-updates only the result cards through htmx
+    if request.headers.get("HX-Request"):
+        return render(request, "events/partials/event_cards.html", context)
+    return render(request, "events/search_results.html", context)
 
 
 @login_required(login_url="account_login")
@@ -45,6 +169,7 @@ def editEvent(request, pk):
     if request.method == "POST":
         form = EventForm(request.POST, instance=event)
         if form.is_valid():
+            invalidate_event_fragments(event.pk, event.updated_on, event.upvote_count, event.status)
             form.save() # Update the event object in the database
             # Redirect to the event's detail page after saving
             return redirect("eventDetail", pk=event.id)
@@ -55,10 +180,10 @@ def editEvent(request, pk):
     return render(request, "events/event_form.html", context)
 
 
-
+@read_from_replica
 def detailView(request, pk):
-    event = get_object_or_404(Event, id=pk)
-    event_comments = event.comment_set.all()
+    event = get_object_or_404(Event.objects.for_viewer(request.user).select_related("plan"), id=pk)
+    form = CommentForm()
 
     if request.method == "POST":
         if request.user.is_authenticated:
@@ -68,43 +193,65 @@ def detailView(request, pk):
                 comment.event = event
                 comment.created_by = request.user
                 comment.save()
+                invalidate_event_fragments(event.pk, event.updated_on, event.upvote_count, event.status)
                 return redirect(event)
-            else:
-                event_comments = event.comment_set.all()
-                context = {
-                    "comments": event_comments,
-                    "commentForm": form,
-                    "event": event
-                }
-                return render(request, "events/event_detail.html", context)
         else:
             return redirect("account_login")
 
-    context = {"comments": event_comments, "commentForm": CommentForm, "event": event}
+    context = {"comments": get_comments_page(event.pk), "commentForm": form, "event": event}
     return render(request, "events/event_detail.html", context)
 
 
+@read_from_replica
+async def asyncDetailView(request, pk):
+    # detailView for ASGI deployments. Posting a comment is a rare write, so it is left to the sync view.
+    request.user = await request.auser()
+    if request.method == "POST":
+        return await sync_to_async(detailView)(request, pk)
+
+    try:
+        event = await Event.objects.for_viewer(request.user).select_related("plan").aget(id=pk)
+    except Event.DoesNotExist:
+        raise Http404("No Event matches the given query.")
+
+    context = {
+        "comments": await akeyset_paginate(comments_queryset(event.pk), None, COMMENTS_PAGE_SIZE, "created_on"),
+        "commentForm": CommentForm(),
+        "event": event,
+        **await aunread_notifications(request),
+    }
+    # A TemplateResponse is rendered in a thread, where lazy context such as the site announcements can query
+    return TemplateResponse(request, "events/event_detail.html", context)
+
+
+def comments_queryset(event_pk):
+    # Newest comments first, with their authors joined in so the template doesn't query once per comment
+    return Comment.objects.filter(event_id=event_pk).select_related("created_by")
+
+
+def get_comments_page(event_pk, cursor=None):
+    return keyset_paginate(comments_queryset(event_pk), cursor, COMMENTS_PAGE_SIZE, "created_on")
+
+
+def eventComments(request, pk):
+    # Returns the next page of older comments for the htmx "load older comments" button
+    event = get_object_or_404(Event.objects.only("pk"), id=pk)
+    context = {"comments": get_comments_page(event.pk, request.GET.get("cursor")), "event": event}
+    return render(request, "events/partials/comments.html", context)
+
+
 @login_required(login_url="account_login")
 def upvoteEvent(request, pk):
-    user = request.user
-    event = get_object_or_404(Event, id=pk)
-    thumb = "fa-regular"
-
-    # Check if the user has upvoted this event already
-    if event.user_upvoted(user):
-        # If already upvoted, remove upvote
-        event.upvotes.remove(user)
-    else:
-        # Add upvote
-        event.upvotes.add(user)
-        thumb = "fa-solid"
+    result = Event.objects.toggle_upvote(pk, request.user)
+    if result is None:
+        raise Http404("No Event matches the given query.")
 
-    num_of_votes = event.number_of_upvotes()
+    invalidate_event_fragments(pk, result.updated_on, result.previous_count, result.previous_status)
+    invalidate_cached_pages()
+    publish_event_update(pk, result.upvote_count, result.status)
 
-    # Check if this the vote count is above the required number of upvotes. If so, change status to planning.
-    if num_of_votes > event.required_num_upvotes:
-        event.status = Event.StatusCode.PLANNING
-        event.save()
+    num_of_votes = result.upvote_count
+    thumb = "fa-solid" if result.upvoted else "fa-regular"
 
     vote_text = "Vote" if num_of_votes == 1 else "Votes"
     
@@ -112,3 +259,120 @@ def upvoteEvent(request, pk):
     return HttpResponse(responseString)
 
 
+def planDates(request, pk):
+    """
+        The date poll of an event's plan. GET renders every proposed date with its vote count in one grouped query.
+        POST takes the viewer's whole ballot as a list of date ids and applies it in one batch.
+    """
+    plan = get_object_or_404(Plan.objects.select_related("best_date"), event_id=pk)
+
+    if request.method == "POST":
+        if not request.user.is_authenticated:
+            return redirect("account_login")
+        date_ids = []
+        for date_id in request.POST.getlist("dates"):
+            try:
+                date_ids.append(uuid.UUID(date_id))
+            except ValueError:
+                pass
+        plan.vote_dates(request.user, date_ids)
+        if not request.headers.get("HX-Request"):
+            return redirect("eventDetail", pk=pk)
+
+    dates = plan.proposeddate_set.with_vote_counts(request.user).order_by("date", "id")
+    context = {"plan": plan, "dates": dates, "event_pk": pk}
+    return render(request, "events/partials/date_poll.html", context)
+
+
+def planVolunteers(request, pk, plan_full=False):
+    # The volunteer roster of an event's plan, with the sign-up or withdraw button for the viewer
+    plan = get_object_or_404(Plan, event_id=pk)
+    roster = list(plan.roster())
+    context = {
+        "plan": plan,
+        "roster": roster,
+        "event_pk": pk,
+        "plan_full": plan_full,
+        "viewer_volunteered": any(volunteer.user_id == request.user.pk for volunteer in roster),
+    }
+    return render(request, "events/partials/volunteers.html", context)
+
+
+@require_POST
+@login_required(login_url="account_login")
+def volunteerSignUp(request, pk):
+    plan_pk = get_object_or_404(Plan.objects.values_list("pk", flat=True), event_id=pk)
+    result = Plan.objects.sign_up(plan_pk, request.user)
+    if not request.headers.get("HX-Request"):
+        return redirect("eventDetail", pk=pk)
+    return planVolunteers(request, pk, plan_full=not result.volunteered)
+
+
+@require_POST
+@login_required(login_url="account_login")
+def volunteerWithdraw(request, pk):
+    plan_pk = get_object_or_404(Plan.objects.values_list("pk", flat=True), event_id=pk)
+    Plan.objects.withdraw(plan_pk, request.user)
+    if not request.headers.get("HX-Request"):
+        return redirect("eventDetail", pk=pk)
+    return planVolunteers(request, pk)
+
+
+async def eventUpdates(request):
+    """
+        Server-Sent Events stream of vote count and status changes for the events listed in ?ids=, starting with
+        their current values. Served through projectCTW/asgi.py, one connection stays open per page. Under WSGI an
+        open stream would hold a worker thread for as long as the page is open, so only the current values are
+        sent and the browser polls by reconnecting.
+    """
+    event_ids = []
+    for value in request.GET.get("ids", "").split(","):
+        try:
+            event_ids.append(uuid.UUID(value))
+        except ValueError:
+            continue
+    event_ids = list(dict.fromkeys(event_ids))[:LIVE_UPDATES_MAX_EVENTS]
+    if not event_ids:
+        # 204 tells EventSource not to reconnect
+        return HttpResponse(status=204)
+
+    streaming = isinstance(request, ASGIRequest)
+    topics = [event_topic(event_id) for event_id in event_ids]
+    broker = get_broker()
+    # Subscribe before reading the current values so no change can fall between the two
+    queue = broker.subscribe(topics) if streaming else None
+    try:
+        snapshot = [
+            sse_message(event_update_message(*values))
+            async for values in Event.objects.filter(pk__in=event_ids).values_list("pk", "upvote_count", "status")
+        ]
+    except BaseException:
+        if streaming:
+            broker.unsubscribe(topics, queue)
+        raise
+
+    if not streaming:
+        response = HttpResponse("retry: 30000\n\n" + "".join(snapshot), content_type="text/event-stream")
+    else:
+        response = StreamingHttpResponse(
+            stream_event_updates(broker, topics, queue, snapshot), content_type="text/event-stream"
+        )
+        # Stop proxies from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+async def stream_event_updates(broker, topics, queue, snapshot):
+    try:
+        yield "retry: 5000\n\n" + "".join(snapshot)
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), LIVE_UPDATES_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+            else:
+                yield sse_message(message)
+    finally:
+        # Runs when the client disconnects and the server cancels the stream
+        broker.unsubscribe(topics, queue)
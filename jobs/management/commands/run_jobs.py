@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import requeue_stale
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue until stopped with SIGINT/SIGTERM."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=1, help="Jobs run at the same time by this worker")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before checking an empty queue again",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=15 * 60,
+            help="Seconds after which a running job is assumed abandoned by a dead worker and requeued",
+        )
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options["stale_after"])
+        worker = Worker(
+            concurrency=options["concurrency"],
+            poll_interval=options["poll_interval"],
+            stale_after=stale_after,
+        )
+
+        if options["burst"] and options["concurrency"] == 1:
+            # Nothing to overlap, so drain the queue in this thread
+            requeue_stale(stale_after)
+            ran = worker.run_pending()
+        else:
+            ran = worker.run(burst=options["burst"])
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {ran} job(s)."))
@@ -0,0 +1,38 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "QU", _("Queued")
+        RUNNING = "RU", _("Running")
+        DONE = "DO", _("Done")
+        FAILED = "FA", _("Failed")
+
+    # Dotted path of a function decorated with jobs.queue.job
+    name = models.CharField(max_length=200)
+    # Stored as JSON, so UUIDs, dates and decimals arrive at the job as strings
+    args = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder)
+    kwargs = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=2, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    # Not picked up before this time; pushed back after each failed attempt
+    run_after = models.DateTimeField(default=timezone.now)
+    # Worker that claimed the job and when, so jobs abandoned by a crashed worker can be requeued
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_on = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The claim query: the oldest due jobs in a given status
+            models.Index(fields=["status", "run_after", "id"], name="job_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
@@ -0,0 +1,127 @@
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import F, Subquery
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the first retry, doubled for every further attempt up to MAX_BACKOFF
+RETRY_BACKOFF = 30
+MAX_BACKOFF = 60 * 60
+
+# Job name -> function, filled in by the job decorator as modules are imported
+registry = {}
+
+
+def job(func=None, *, max_attempts=3):
+    """
+        Registers a function as a background job and gives it an enqueue() method taking the same arguments:
+
+            @job(max_attempts=5)
+            def send_digest(user_id): ...
+
+            send_digest.enqueue(user.pk)
+
+        The function itself is left unchanged and can still be called directly. Arguments are stored as JSON.
+        enqueue() only inserts a row, so inside a transaction the job is committed or rolled back with it and a
+        worker never runs a job for a change that didn't happen.
+    """
+    def decorate(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def enqueue(*args, **kwargs):
+            return Job.objects.create(name=name, args=list(args), kwargs=kwargs, max_attempts=max_attempts)
+
+        func.job_name = name
+        func.enqueue = enqueue
+        registry[name] = func
+        return func
+
+    return decorate if func is None else decorate(func)
+
+
+def resolve(name):
+    # Importing the module runs its decorators. Only registered functions run, never arbitrary importable names.
+    if name not in registry:
+        import_string(name)
+    return registry[name]
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(RETRY_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF))
+
+
+def claim_jobs(worker_id, limit):
+    """
+        Marks up to limit due jobs as running for this worker and returns them, oldest first.
+
+        On databases with SELECT ... FOR UPDATE SKIP LOCKED (Postgres) concurrent workers skip each other's rows
+        instead of queueing behind them. Elsewhere (SQLite) one conditional UPDATE claims the batch: SQLite runs
+        one writer at a time, so a job can only move from queued to running once.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.Status.QUEUED, run_after__lte=now).order_by("run_after", "id")
+    # A per-claim token identifies exactly the rows this call took
+    token = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+    claimed = {
+        "status": Job.Status.RUNNING,
+        "locked_by": token,
+        "locked_on": now,
+        "attempts": F("attempts") + 1,
+    }
+
+    alias = router.db_for_write(Job)
+    if connections[alias].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=alias):
+            ids = list(due.select_for_update(skip_locked=True).values_list("pk", flat=True)[:limit])
+            Job.objects.filter(pk__in=ids).update(**claimed)
+    else:
+        Job.objects.filter(pk__in=Subquery(due.values("pk")[:limit]), status=Job.Status.QUEUED).update(**claimed)
+
+    return list(Job.objects.filter(locked_by=token, status=Job.Status.RUNNING).order_by("run_after", "id"))
+
+
+def run_job(job):
+    """
+        Runs a claimed job and records the outcome. A failed job is requeued with exponential backoff until it
+        has used max_attempts, then left as failed with its traceback in last_error.
+        Returns True if the job succeeded.
+    """
+    try:
+        resolve(job.name)(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) failed permanently after %s attempt(s)", job.pk, job.name, job.attempts)
+            changes = {"status": Job.Status.FAILED, "finished_on": timezone.now()}
+        else:
+            logger.warning("Job %s (%s) failed, retrying in %s", job.pk, job.name, backoff(job.attempts))
+            changes = {"status": Job.Status.QUEUED, "run_after": timezone.now() + backoff(job.attempts)}
+        Job.objects.filter(pk=job.pk).update(**changes, last_error=error, locked_by="", locked_on=None)
+        return False
+
+    Job.objects.filter(pk=job.pk).update(status=Job.Status.DONE, finished_on=timezone.now(), locked_by="")
+    return True
+
+
+def requeue_stale(timeout):
+    """
+        Returns jobs that have been running for longer than timeout (a timedelta) to the queue, or marks them
+        failed if they have no attempts left. These are jobs whose worker died mid-run.
+    """
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_on__lt=timezone.now() - timeout)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED, finished_on=timezone.now(), last_error="Worker stopped while running the job"
+    )
+    requeued = stale.filter(attempts__lt=F("max_attempts")).update(
+        status=Job.Status.QUEUED, locked_by="", locked_on=None
+    )
+    return requeued + failed
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Job
+from ..queue import backoff, claim_jobs, job, requeue_stale, run_job
+from ..worker import Worker
+
+
+calls = []
+
+
+@job
+def record(value, suffix=""):
+    calls.append(f"{value}{suffix}")
+
+
+@job(max_attempts=2)
+def explode():
+    raise ValueError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_stores_call(self):
+        record.enqueue(1, suffix="!")
+        queued = Job.objects.get()
+        self.assertEqual(queued.name, "jobs.tests.test_queue.record")
+        self.assertEqual((queued.args, queued.kwargs, queued.status), ([1], {"suffix": "!"}, Job.Status.QUEUED))
+        # Still callable directly
+        record(2)
+        self.assertEqual(calls, ["2"])
+
+    def test_enqueue_rolls_back_with_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                record.enqueue(1)
+                raise RuntimeError
+        self.assertFalse(Job.objects.exists())
+
+    def test_run_pending_runs_jobs_in_order(self):
+        for value in range(3):
+            record.enqueue(value)
+
+        self.assertEqual(Worker().run_pending(), 3)
+        self.assertEqual(calls, ["0", "1", "2"])
+        self.assertEqual(Job.objects.filter(status=Job.Status.DONE, attempts=1).count(), 3)
+
+    def test_claimed_jobs_are_not_claimed_again(self):
+        for value in range(3):
+            record.enqueue(value)
+
+        first = claim_jobs("worker-a", 2)
+        second = claim_jobs("worker-b", 2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({j.pk for j in first} & {j.pk for j in second})
+        self.assertEqual(claim_jobs("worker-c", 2), [])
+
+    def test_future_jobs_wait(self):
+        record.enqueue(1)
+        Job.objects.update(run_after=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(claim_jobs("worker", 1), [])
+
+    def test_failure_retries_with_backoff_then_fails(self):
+        explode.enqueue()
+
+        before = timezone.now()
+        with self.assertLogs("jobs.queue", "WARNING"):
+            self.assertFalse(run_job(claim_jobs("worker", 1)[0]))
+        failed = Job.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (Job.Status.QUEUED, 1))
+        self.assertGreaterEqual(failed.run_after, before + backoff(1))
+        self.assertIn("ValueError: boom", failed.last_error)
+
+        Job.objects.update(run_after=timezone.now())
+        with self.assertLogs("jobs.queue", "ERROR"):
+            self.assertFalse(run_job(claim_jobs("worker", 1)[0]))
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.attempts), (Job.Status.FAILED, 2))
+        self.assertIsNotNone(failed.finished_on)
+
+    def test_backoff_doubles_up_to_the_limit(self):
+        self.assertEqual(backoff(2), backoff(1) * 2)
+        self.assertEqual(backoff(50), backoff(51))
+
+    def test_unregistered_names_never_run(self):
+        Job.objects.create(name="os.getcwd")
+        with self.assertLogs("jobs.queue", "WARNING"):
+            self.assertFalse(run_job(claim_jobs("worker", 1)[0]))
+        self.assertIn("KeyError", Job.objects.get().last_error)
+
+    def test_requeue_stale(self):
+        record.enqueue(1)
+        explode.enqueue()
+        for claimed in claim_jobs("dead-worker", 2):
+            # explode has used both of its attempts
+            Job.objects.filter(pk=claimed.pk, name=explode.job_name).update(attempts=2)
+        Job.objects.update(locked_on=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale(timedelta(minutes=15)), 2)
+        self.assertEqual(Job.objects.get(name=record.job_name).status, Job.Status.QUEUED)
+        self.assertEqual(Job.objects.get(name=explode.job_name).status, Job.Status.FAILED)
+
+    def test_run_jobs_command_burst(self):
+        record.enqueue("a")
+        record.enqueue("b")
+        out = StringIO()
+        call_command("run_jobs", "--burst", stdout=out)
+        self.assertEqual(calls, ["a", "b"])
+        self.assertIn("Ran 2 job(s).", out.getvalue())
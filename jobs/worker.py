@@ -0,0 +1,93 @@
+import logging
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.db import close_old_connections
+
+from .queue import claim_jobs, requeue_stale, run_job
+
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+        Claims due jobs from the queue and runs at most concurrency of them at a time.
+
+        run() works the queue on a pool of concurrency threads, each with its own database connection, and only
+        claims as many jobs as it has free threads so several worker processes share the queue fairly.
+        run_pending() drains the queue one job at a time in the calling thread.
+    """
+
+    def __init__(self, concurrency=1, poll_interval=1.0, stale_after=timedelta(minutes=15)):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+
+    def stop(self, *args):
+        # Finish the jobs already running but don't claim any more
+        self.stopping = True
+
+    def run_pending(self):
+        """
+            Runs due jobs in the calling thread until none are left. Returns the number of jobs run.
+        """
+        ran = 0
+        while not self.stopping:
+            jobs = claim_jobs(self.worker_id, 1)
+            if not jobs:
+                break
+            run_job(jobs[0])
+            ran += 1
+        return ran
+
+    def run(self, burst=False):
+        """
+            Works the queue until stopped by SIGINT/SIGTERM, or with burst until it is empty.
+            Returns the number of jobs run.
+        """
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info("Worker %s started with concurrency %s", self.worker_id, self.concurrency)
+
+        ran = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as executor:
+            running = set()
+            last_stale_check = 0
+            while not self.stopping:
+                if time.monotonic() - last_stale_check > self.stale_after.total_seconds() / 2:
+                    requeue_stale(self.stale_after)
+                    last_stale_check = time.monotonic()
+
+                free = self.concurrency - len(running)
+                jobs = claim_jobs(self.worker_id, free) if free else []
+                running |= {executor.submit(self.run_in_thread, job) for job in jobs}
+
+                if not running:
+                    if burst:
+                        break
+                    time.sleep(self.poll_interval)
+                    close_old_connections()
+                    continue
+
+                done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                ran += len(done)
+
+            ran += len(wait(running).done)
+        close_old_connections()
+        logger.info("Worker %s stopped after %s job(s)", self.worker_id, ran)
+        return ran
+
+    def run_in_thread(self, job):
+        # Pool threads keep their connection between jobs, so drop it when it has gone stale or broken
+        close_old_connections()
+        try:
+            return run_job(job)
+        finally:
+            close_old_connections()
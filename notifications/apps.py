@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class NotificationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "notifications"
+
+    def ready(self):
+        from events.signals import status_changed
+        from .fanout import enqueue_status_change
+
+        status_changed.connect(enqueue_status_change, dispatch_uid="notifications.fanout")
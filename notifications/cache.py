@@ -0,0 +1,30 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+# Unread counts are deleted whenever they change, so the timeout only bounds how long a missed invalidation lasts
+UNREAD_COUNT_TIMEOUT = 60 * 60
+# With a per-process cache (the LocMemCache default), the deletes made by the run_jobs worker after a fan-out never
+# reach the web processes, so their counts are only kept for a few seconds
+LOCAL_UNREAD_COUNT_TIMEOUT = 5
+
+
+def unread_count_timeout():
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return LOCAL_UNREAD_COUNT_TIMEOUT
+    return UNREAD_COUNT_TIMEOUT
+
+
+def unread_count_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def invalidate_unread_counts(user_ids):
+    """
+        Drops the cached unread counts of the given users once the current transaction commits, so a count is
+        never recomputed from rows that are about to be rolled back or aren't visible yet.
+    """
+    keys = [unread_count_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
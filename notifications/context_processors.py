@@ -0,0 +1,21 @@
+from django.utils.functional import SimpleLazyObject
+
+from .models import aunread_count, unread_count
+
+
+def unread_notifications(request):
+    # Lazy, so only pages that actually render the navbar badge look the count up
+    if not request.user.is_authenticated:
+        return {}
+    return {"unread_notification_count": SimpleLazyObject(lambda: unread_count(request.user))}
+
+
+async def aunread_notifications(request):
+    """
+        The same context for async views, which add it to their own context: templates render synchronously, so
+        they can't run the lazy lookup from inside an event loop.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return {}
+    return {"unread_notification_count": await aunread_count(user)}
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Event, Upvote
+from jobs.queue import job
+from .cache import invalidate_unread_counts
+from .models import EventStatusChange
+
+
+BATCH_SIZE = 500
+
+
+def status_change_message(event, old_status, new_status):
+    old_label = Event.StatusCode(old_status).label
+    new_label = Event.StatusCode(new_status).label
+    suffix = f" moved from {old_label} to {new_label}"
+    max_name = EventStatusChange._meta.get_field("message").max_length - len(suffix)
+    name = event.name if len(event.name) <= max_name else event.name[:max_name - 1] + "…"
+    return name + suffix
+
+
+@job(max_attempts=5)
+def notify_status_change(event_id, old_status, new_status, batch_size=BATCH_SIZE):
+    """
+        Creates one EventStatusChange for the event's creator and each of its upvoters, batch_size rows per
+        INSERT. Upvoter ids are streamed rather than loaded all at once, so popular events don't need their whole
+        voter list in memory. Returns the number of notifications created.
+
+        Enqueued as a background job by enqueue_status_change for every status change, so the vote, edit or admin
+        save that changes the status doesn't wait for it. The rows are written in one transaction, so a retried run
+        never leaves duplicates behind.
+    """
+    event = Event.objects.filter(pk=event_id).only("name", "created_by_id").first()
+    if event is None:
+        return 0
+
+    message = status_change_message(event, old_status, new_status)
+    created_on = timezone.now()
+    voter_ids = (
+        Upvote.objects.filter(event_id=event_id)
+        .exclude(user_id=event.created_by_id)
+        .values_list("user_id", flat=True)
+        .order_by()
+        .iterator(chunk_size=batch_size)
+    )
+
+    recipient_ids = [event.created_by_id] if event.created_by_id else []
+    created = 0
+    with transaction.atomic():
+        for user_id in voter_ids:
+            recipient_ids.append(user_id)
+            if len(recipient_ids) >= batch_size:
+                created += create_notifications(event_id, message, created_on, recipient_ids)
+                recipient_ids = []
+        if recipient_ids:
+            created += create_notifications(event_id, message, created_on, recipient_ids)
+    return created
+
+
+def enqueue_status_change(event_id, old_status, new_status, **kwargs):
+    # events.signals.status_changed receiver (see NotificationsConfig.ready)
+    notify_status_change.enqueue(event_id, old_status, new_status)
+
+
+def create_notifications(event_id, message, created_on, recipient_ids):
+    EventStatusChange.objects.bulk_create([
+        EventStatusChange(source_event_id=event_id, recipient_id=user_id, message=message, created_on=created_on)
+        for user_id in recipient_ids
+    ])
+    invalidate_unread_counts(recipient_ids)
+    return len(recipient_ids)
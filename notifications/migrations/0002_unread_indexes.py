@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_event_search_index'),
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventstatuschange',
+            index=models.Index(fields=['recipient', 'read', 'created_on'], name='statuschange_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(fields=['recipient', 'read', 'created_on'], name='friendrequest_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_volunteer_through_counts'),
+        ('notifications', '0002_unread_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventstatuschange',
+            index=models.Index(fields=['recipient', 'created_on'], name='statuschange_list_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(fields=['recipient', 'created_on'], name='friendrequest_list_idx'),
+        ),
+    ]
@@ -1,16 +1,48 @@
+from django.core.cache import cache
 from django.db import models
 
 from django.contrib.auth import get_user_model
 
+from .cache import invalidate_unread_counts, unread_count_key, unread_count_timeout
+
 User = get_user_model()
 
+
+class NotificationQuerySet(models.QuerySet):
+    def unread(self):
+        return self.filter(read=False)
+
+    def mark_read(self):
+        """
+            Marks every unread notification in the queryset as read with one UPDATE and drops the affected
+            recipients' cached unread counts. Returns the number of notifications changed.
+        """
+        unread = self.unread()
+        recipient_ids = list(unread.values_list("recipient_id", flat=True).distinct().order_by())
+        if not recipient_ids:
+            return 0
+        changed = unread.update(read=True)
+        # After the UPDATE, or under autocommit a concurrent request could cache the old count in between
+        invalidate_unread_counts(recipient_ids)
+        return changed
+
+
 class Notification(models.Model):
     message = models.CharField(max_length=150, blank=True)
     created_on = models.DateTimeField(auto_created=True)
     read = models.BooleanField(default=False)
-    
+
+    objects = NotificationQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_unread_counts([self.recipient_id])
+
     def mark_read(self):
-        self.read = True
+        if not self.read:
+            self.read = True
+            type(self).objects.filter(pk=self.pk).update(read=True)
+            invalidate_unread_counts([self.recipient_id])
         
     class Meta:
         abstract = True
@@ -19,8 +51,58 @@ class Notification(models.Model):
 class EventStatusChange(Notification):
     source_event = models.ForeignKey('events.Event', on_delete=models.CASCADE)
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recipients")
+
+    class Meta:
+        indexes = [
+            # Unread counts for one user
+            models.Index(fields=["recipient", "read", "created_on"], name="statuschange_unread_idx"),
+            # The newest-first notification list for one user, read or not
+            models.Index(fields=["recipient", "created_on"], name="statuschange_list_idx"),
+        ]
     
 
 class FriendRequest(Notification):
     originator = models.ForeignKey(User, on_delete=models.CASCADE, related_name="originator")
-    recipient = models.ForeignKey(User, on_delete=models.CASCADE)
\ No newline at end of file
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["recipient", "read", "created_on"], name="friendrequest_unread_idx"),
+            models.Index(fields=["recipient", "created_on"], name="friendrequest_list_idx"),
+        ]
+
+
+NOTIFICATION_MODELS = [EventStatusChange, FriendRequest]
+
+
+def unread_count(user):
+    """
+        The number of unread notifications of every kind for the user, served from the cache after the first
+        call until one of them is created or read.
+    """
+    key = unread_count_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        # One COUNT over a UNION ALL of the per-table index scans
+        unread = [model.objects.filter(recipient=user).unread().values("pk") for model in NOTIFICATION_MODELS]
+        count = unread[0].union(*unread[1:], all=True).count()
+        cache.set(key, count, unread_count_timeout())
+    return count
+
+
+async def aunread_count(user):
+    # unread_count for async views
+    key = unread_count_key(user.pk)
+    count = await cache.aget(key)
+    if count is None:
+        unread = [model.objects.filter(recipient=user).unread().values("pk") for model in NOTIFICATION_MODELS]
+        count = await unread[0].union(*unread[1:], all=True).acount()
+        await cache.aset(key, count, unread_count_timeout())
+    return count
+
+
+def mark_all_read(user):
+    # One UPDATE per notification table
+    changed = sum(model.objects.filter(recipient=user).unread().update(read=True) for model in NOTIFICATION_MODELS)
+    invalidate_unread_counts([user.pk])
+    return changed
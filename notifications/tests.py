@@ -1,3 +1,210 @@
-from django.test import TestCase
+import tempfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event
+from jobs.models import Job
+from jobs.worker import Worker
+from . import fanout
+from .cache import LOCAL_UNREAD_COUNT_TIMEOUT, UNREAD_COUNT_TIMEOUT, unread_count_key
+from .models import EventStatusChange, FriendRequest, mark_all_read, unread_count
+
+
+class StatusChangeFanoutTests(TestCase):
+    password = "testpass123"
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.creator = User.objects.create_user(username="creator", email="creator@email.com", password=cls.password)
+        cls.voters = [
+            User.objects.create_user(username=f"voter{i}", email=f"voter{i}@email.com", password=cls.password)
+            for i in range(5)
+        ]
+        cls.event = Event.objects.create(
+            name="testEvent",
+            description="testdescription",
+            location="location",
+            created_by=cls.creator,
+            required_num_upvotes=4,
+        )
+
+    def test_notifies_creator_and_each_voter_once(self):
+        # The creator upvoting their own event must not get two notifications
+        for user in [self.creator, *self.voters[:3]]:
+            Event.objects.toggle_upvote(self.event.pk, user)
+
+        created = fanout.notify_status_change(self.event.pk, "PR", "PL")
+
+        self.assertEqual(created, 4)
+        notifications = EventStatusChange.objects.filter(source_event=self.event)
+        self.assertCountEqual(
+            notifications.values_list("recipient_id", flat=True),
+            [self.creator.pk] + [voter.pk for voter in self.voters[:3]],
+        )
+        self.assertEqual(notifications.first().message, "testEvent moved from Proposal to Planning")
+
+    def test_inserts_in_batches(self):
+        for voter in self.voters:
+            Event.objects.toggle_upvote(self.event.pk, voter)
+
+        # One query for the event, one for the voter ids and one INSERT per batch of two (plus the savepoint)
+        with self.assertNumQueries(7):
+            created = fanout.notify_status_change(self.event.pk, "PR", "PL", batch_size=2)
+        self.assertEqual(created, 6)
+
+    def test_long_names_fit_the_message(self):
+        self.event.name = "x" * 100
+        self.event.save()
+        message = fanout.status_change_message(self.event, "PR", "PL")
+        self.assertLessEqual(len(message), EventStatusChange._meta.get_field("message").max_length)
+        self.assertTrue(message.endswith(" moved from Proposal to Planning"))
+
+    def test_promoting_vote_enqueues_fanout(self):
+        for voter in self.voters[:4]:
+            Event.objects.toggle_upvote(self.event.pk, voter)
+        self.client.login(email=self.voters[4].email, password=self.password)
+
+        self.client.post(reverse("upvote", kwargs={"pk": self.event.pk}))
+
+        # Nothing is written by the request itself, the queued job does it
+        self.assertFalse(EventStatusChange.objects.exists())
+        job = Job.objects.get()
+        self.assertEqual((job.name, job.args), (fanout.notify_status_change.job_name, [str(self.event.pk), "PR", "PL"]))
+
+        Worker().run_pending()
+        self.assertEqual(EventStatusChange.objects.filter(source_event=self.event).count(), 6)
+
+    def test_ordinary_vote_enqueues_nothing(self):
+        self.client.login(email=self.voters[0].email, password=self.password)
+        self.client.post(reverse("upvote", kwargs={"pk": self.event.pk}))
+        self.assertFalse(Job.objects.exists())
+
+    def test_saved_status_change_enqueues_fanout(self):
+        # As the admin does. Saves that leave the status alone enqueue nothing.
+        event = Event.objects.get(pk=self.event.pk)
+        event.name = "renamed"
+        event.save()
+        self.assertFalse(Job.objects.exists())
+
+        event.status = Event.StatusCode.SCHEDULED
+        event.save()
+        event.save()
+        job = Job.objects.get()
+        self.assertEqual((job.name, job.args), (fanout.notify_status_change.job_name, [str(self.event.pk), "PR", "SC"]))
+
+    def test_new_events_enqueue_nothing(self):
+        Event.objects.create(name="new", description="d", location="l", status=Event.StatusCode.PLANNING)
+        self.assertFalse(Job.objects.exists())
+
+
+class UnreadCountTests(TestCase):
+    password = "testpass123"
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username="reader", email="reader@email.com", password=cls.password)
+        cls.friend = User.objects.create_user(username="friend", email="friend@email.com", password=cls.password)
+        cls.event = Event.objects.create(name="testEvent", description="d", location="l", created_by=cls.friend)
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(email=self.user.email, password=self.password)
+
+    def notify(self, count=1):
+        for _ in range(count):
+            EventStatusChange.objects.create(
+                source_event=self.event, recipient=self.user, message="changed", created_on=timezone.now()
+            )
+
+    def test_count_is_cached_until_invalidated(self):
+        self.notify(2)
+        FriendRequest.objects.create(originator=self.friend, recipient=self.user, created_on=timezone.now())
+
+        self.assertEqual(unread_count(self.user), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 3)
+
+        # Invalidation waits for the transaction to commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notify()
+        self.assertEqual(unread_count(self.user), 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EventStatusChange.objects.first().mark_read()
+        self.assertEqual(unread_count(self.user), 3)
+
+    def test_fanout_invalidates_recipient_counts(self):
+        self.assertEqual(unread_count(self.friend), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            fanout.notify_status_change(self.event.pk, "PR", "PL")
+        self.assertEqual(unread_count(self.friend), 1)
+
+    def test_mark_read_persists(self):
+        self.notify()
+        notification = EventStatusChange.objects.get()
+        notification.mark_read()
+        notification.refresh_from_db()
+        self.assertTrue(notification.read)
+
+    def test_mark_all_read_issues_one_update_per_table(self):
+        self.notify(5)
+        FriendRequest.objects.create(originator=self.friend, recipient=self.user, created_on=timezone.now())
+
+        with self.assertNumQueries(2), self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mark_all_read(self.user), 6)
+        self.assertEqual(unread_count(self.user), 0)
+
+    def test_queryset_mark_read(self):
+        self.notify(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(EventStatusChange.objects.filter(recipient=self.user).mark_read(), 3)
+        self.assertEqual(unread_count(self.user), 0)
+
+    def cached_timeout(self):
+        with mock.patch.object(cache, "set", wraps=cache.set) as set_count:
+            unread_count(self.user)
+        return set_count.call_args.args[2]
+
+    def test_per_process_cache_keeps_counts_briefly(self):
+        # The run_jobs worker can't reach the web processes' local memory caches to invalidate them
+        self.assertEqual(self.cached_timeout(), LOCAL_UNREAD_COUNT_TIMEOUT)
+
+    def test_shared_cache_keeps_counts_until_invalidated(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": directory,
+        }}):
+            self.assertEqual(self.cached_timeout(), UNREAD_COUNT_TIMEOUT)
+
+    @skipUnless(connection.vendor == "sqlite", "Reads SQLite's query plan")
+    def test_list_walks_the_recipient_index(self):
+        plan = str(EventStatusChange.objects.filter(recipient=self.user).order_by("-created_on").explain())
+        self.assertIn("statuschange_list_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_navbar_badge_costs_no_queries_when_cached(self):
+        self.notify(2)
+        response = self.client.get(reverse("about"))
+        self.assertContains(response, "2\n  <span class=\"sr-only\">unread</span>")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("about"))
+        self.assertFalse([q["sql"] for q in queries if "notifications_" in q["sql"]])
+
+    def test_mark_all_read_view(self):
+        self.notify(2)
+        response = self.client.post(reverse("markAllRead"))
+        self.assertRedirects(response, reverse("notifications"))
+        self.assertFalse(EventStatusChange.objects.unread().exists())
+
+        response = self.client.get(reverse("notifications"))
+        self.assertContains(response, "changed", count=2)
+        self.assertNotContains(response, "Mark all as read")
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.notificationList, name="notifications"),
+    path("read/", views.markAllRead, name="markAllRead"),
+]
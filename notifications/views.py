@@ -1,3 +1,36 @@
-from django.shortcuts import render
+from heapq import merge
 
-# Create your views here.
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+
+from .models import EventStatusChange, FriendRequest, mark_all_read
+
+
+NOTIFICATIONS_SHOWN = 50
+
+
+@login_required(login_url="account_login")
+def notificationList(request):
+    # Each query walks the (recipient, created_on) index backwards; the two newest-first lists are merged
+    status_changes = (
+        EventStatusChange.objects.filter(recipient=request.user)
+        .select_related("source_event")
+        .order_by("-created_on")[:NOTIFICATIONS_SHOWN]
+    )
+    friend_requests = (
+        FriendRequest.objects.filter(recipient=request.user)
+        .select_related("originator")
+        .order_by("-created_on")[:NOTIFICATIONS_SHOWN]
+    )
+    notifications = list(merge(status_changes, friend_requests, key=lambda n: n.created_on, reverse=True))
+
+    context = {"notifications": notifications[:NOTIFICATIONS_SHOWN]}
+    return render(request, "notifications/notification_list.html", context)
+
+
+@require_POST
+@login_required(login_url="account_login")
+def markAllRead(request):
+    mark_all_read(request.user)
+    return redirect("notifications")
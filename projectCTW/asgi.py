@@ -3,6 +3,9 @@ ASGI config for projectCTW project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serving through ASGI lets long-lived connections such as the live vote count stream (events.views.eventUpdates)
+stay open without holding a worker thread each.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
@@ -14,3 +17,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "projectCTW.settings")
 
 application = get_asgi_application()
+
+# Import the warm-up only now, once Django is set up
+from base.warmup import warm_up
+
+warm_up()
@@ -0,0 +1,19 @@
+"""
+URL configuration for ASGI deployments, used when ASYNC_VIEWS is set.
+
+Routes the read-heavy pages to their async variants so a request doesn't hold a thread while it waits on the
+database, and falls through to projectCTW.urls for everything else.
+"""
+from django.urls import path
+
+from events import views as event_views
+from userProfile import views as profile_views
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("events/", event_views.asyncProposedEvents, name="proposals"),
+    path("events/feed/", event_views.asyncProposedEventsFeed, name="proposalsFeed"),
+    path("events/detail/<uuid:pk>/", event_views.asyncDetailView, name="eventDetail"),
+    path("account/profile/<str:slug>/", profile_views.async_user_profile, name="user_profile"),
+] + sync_urlpatterns
@@ -0,0 +1,71 @@
+"""
+Jinja2 environment for the opt-in Jinja2 template backend (settings.JINJA2_TEMPLATES).
+
+Only the hot event pages have Jinja2 versions, in events/jinja2/. They render their event cards, comments and
+comment form in Jinja2, and take the site layout (navbar, footer, notifications) from the Django partials through
+django_include(), so the layout is still written once.
+"""
+
+from crispy_tailwind.templatetags.tailwind_filters import as_crispy_form
+from django.template import Context, defaultfilters, engines
+from django.template.backends.jinja2 import Jinja2
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.timezone import template_localtime
+from jinja2 import Environment, pass_context
+from markupsafe import Markup
+
+from base.profiling import ProfiledTemplate
+from events.templatetags.event_tags import event_status_color, upvoted
+
+
+class ProfiledJinja2(Jinja2):
+    # The Jinja2 backend, timing each top-level render for ProfilingMiddleware like ProfiledDjangoTemplates
+    def from_string(self, template_code):
+        return ProfiledTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name))
+
+
+def url(name, *args, **kwargs):
+    return reverse(name, args=args, kwargs=kwargs)
+
+
+def date(value, arg=None):
+    # Django converts datetimes to the current time zone before its date filter sees them
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+def crispy(form):
+    # {{ form|crispy }} from crispy_tailwind's tailwind_filters
+    return Markup(as_crispy_form(form))
+
+
+@pass_context
+def django_include(context, template_name, **extra):
+    """
+        Renders a Django template with the current context, like {% include %} with extra variables. Rendered
+        through the Django engine itself, so its time isn't counted twice by the profiler.
+    """
+    template = engines["django"].engine.get_template(template_name)
+    return Markup(template.render(Context({**context.get_all(), **extra})))
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({
+        "django_include": django_include,
+        "event_status_color": event_status_color,
+        "static": static,
+        "url": url,
+    })
+    env.filters.update({
+        "capfirst": defaultfilters.capfirst,
+        "crispy": crispy,
+        "date": date,
+        "pluralize": defaultfilters.pluralize,
+        "timesince": defaultfilters.timesince_filter,
+        "upvoted": upvoted,
+    })
+    return env
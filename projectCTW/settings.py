@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 
 from pathlib import Path
 from environs import Env
+import dj_database_url
 import os
 
 env = Env()
@@ -67,11 +68,14 @@ INSTALLED_APPS = [
     "events.apps.EventsConfig",
     "userProfile.apps.UserprofileConfig",
     "notifications.apps.NotificationsConfig",
+    "jobs.apps.JobsConfig",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    "base.middleware.WhiteNoiseMiddleware", # whitenoise, usable without a thread per request under ASGI
+    "base.profiling.ProfilingMiddleware", # Server-Timing headers and sampled query logs
+    "base.replicas.ReplicaMiddleware", # read-your-writes pinning when read replicas are configured
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -82,11 +86,21 @@ MIDDLEWARE = [
     "django_browser_reload.middleware.BrowserReloadMiddleware", # django-browser-reload
 ]
 
-ROOT_URLCONF = "projectCTW.urls"
+# Serve the async variants of the read-heavy views. Only worth it under ASGI (see projectCTW/asgi.py); under
+# WSGI Django runs each async view in its own event loop.
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
+
+ROOT_URLCONF = "projectCTW.async_urls" if ASYNC_VIEWS else "projectCTW.urls"
+
+# Build the URL resolver and compile every template when the WSGI/ASGI application is loaded, rather than on
+# each worker's first requests (see base/warmup.py)
+WARM_UP = env.bool("WARM_UP", default=True)
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates, timing renders for base.profiling.ProfilingMiddleware
+        "BACKEND": "base.profiling.ProfiledDjangoTemplates",
+        "NAME": "django",
         "DIRS": [os.path.join(BASE_DIR, 'templates')],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -95,14 +109,60 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "notifications.context_processors.unread_notifications",
+                "base.context_processors.announcements",
             ],
         },
     },
 ]
 
+# Render the proposals and event detail pages with Jinja2, from the templates in events/jinja2/ (see
+# projectCTW/jinja2.py). The entry goes first so those templates are found before their Django counterparts;
+# every other template is only found by the Django engine.
+JINJA2_TEMPLATES = env.bool("JINJA2_TEMPLATES", default=False)
+JINJA2_BACKEND = {
+    "BACKEND": "projectCTW.jinja2.ProfiledJinja2",
+    "NAME": "jinja2",
+    "DIRS": [],
+    "APP_DIRS": True,
+    "OPTIONS": {
+        "environment": "projectCTW.jinja2.environment",
+        "context_processors": TEMPLATES[0]["OPTIONS"]["context_processors"],
+    },
+}
+if JINJA2_TEMPLATES:
+    TEMPLATES.insert(0, JINJA2_BACKEND)
+
 WSGI_APPLICATION = "projectCTW.wsgi.application"
 
 
+# Request profiling
+# With DEBUG on, every response gets a Server-Timing header with DB, template and total time. It shows anyone how
+# long each page spends in the database, so it's off in production unless PROFILING_SERVER_TIMING turns it on.
+# A PROFILING_SAMPLE_RATE fraction of requests (0.0 - 1.0) also logs its full query list to the
+# "projectCTW.profiling" logger.
+
+PROFILING_SERVER_TIMING = env.bool("PROFILING_SERVER_TIMING", default=DEBUG)
+PROFILING_SAMPLE_RATE = env.float("PROFILING_SAMPLE_RATE", default=0.0)
+
+# Live vote counts
+# Publish/subscribe backend behind the /events/updates/ Server-Sent Events stream. The default only reaches
+# connections served by the same process; see events.live.InProcessBroker for the interface to implement.
+
+LIVE_UPDATES_BROKER = env.str("LIVE_UPDATES_BROKER", default="events.live.InProcessBroker")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "projectCTW.profiling": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
+
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
@@ -110,6 +170,39 @@ DATABASES = {
     "default": env.dj_db_url("DATABASE_URL", default="sqlite:///db.sqlite3")
 }
 
+# Read replicas
+# DATABASE_REPLICA_URLS is a comma separated list of database URLs for read-only copies of DATABASE_URL, added as
+# aliases replica1, replica2, ... GET requests to the views wrapped in base.replicas.read_from_replica read from
+# a random replica, unless the visitor wrote something within the last REPLICA_PIN_SECONDS.
+
+REPLICA_DATABASES = []
+for number, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[]), 1):
+    DATABASES[f"replica{number}"] = {**dj_database_url.parse(url), "TEST": {"MIRROR": "default"}}
+    REPLICA_DATABASES.append(f"replica{number}")
+
+DATABASE_ROUTERS = ["base.replicas.ReplicaRouter"]
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=10)
+
+
+# Cache
+# Local memory by default, which is per process. Deployments running several processes should point CACHE_BACKEND
+# at a shared backend so page invalidation reaches all of them, e.g.
+# django.core.cache.backends.filebased.FileBasedCache with CACHE_LOCATION=/var/tmp/projectctw_cache, or
+# django.core.cache.backends.redis.RedisCache with CACHE_LOCATION=redis://...
+
+CACHES = {
+    "default": {
+        "BACKEND": env.str("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env.str("CACHE_LOCATION", default="projectctw"),
+        "TIMEOUT": env.int("CACHE_TIMEOUT", default=300),
+    }
+}
+
+# Seconds anonymous visitors are served home, about and the proposals feed from base.page_cache without rendering.
+# Any write those pages show invalidates them sooner. 0 turns the page cache off, the default with DEBUG so
+# template changes show up straight away.
+PAGE_CACHE_TIMEOUT = env.int("PAGE_CACHE_TIMEOUT", default=0 if DEBUG else 60)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
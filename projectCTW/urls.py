@@ -24,6 +24,7 @@ urlpatterns = [
     path("accounts/", include("allauth.urls")),
     path("account/", include("userProfile.urls")),
     path("events/", include("events.urls")),
+    path("notifications/", include("notifications.urls")),
     path("", include("base.urls")),
     path("__reload__/", include("django_browser_reload.urls")),
 ]
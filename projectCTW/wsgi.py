@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "projectCTW.settings")
 
 application = get_wsgi_application()
+
+# Import the warm-up only now, once Django is set up
+from base.warmup import warm_up
+
+warm_up()
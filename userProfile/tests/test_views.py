@@ -1,6 +1,13 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 
+from base.tests.query_budget import QueryBudgetMixin
+from events.models import Event
+
 
 class RegisterpageTests(TestCase):
     def test_url_exists_at_correct_location(self):
@@ -38,3 +45,32 @@ class LoginpageTests(TestCase):
         response = self.client.get(reverse("account_login"))
         self.assertContains(response, "Welcome back")
         self.assertContains(response, "Sign in")
+
+
+class ProfileQueryBudgetTests(QueryBudgetMixin, TestCase):
+    password = "testpass123"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username = "profileuser",
+            email = "profileuser@email.com",
+            password = cls.password
+        )
+
+    def add_activity(self):
+        call_command("seed_data", users=10, events=20, seed=1, stdout=StringIO())
+        for event in Event.objects.all()[:10]:
+            Event.objects.toggle_upvote(event.pk, self.user)
+        Event.objects.filter(pk__in=Event.objects.values("pk")[:5]).update(created_by=self.user)
+
+    def test_profile(self):
+        url = reverse("user_profile", kwargs={"slug": self.user.username})
+        # Includes the site announcements, measured with a cold cache
+        self.assertQueriesDoNotGrow(lambda: self.client.get(url), self.add_activity, budget=2)
+
+    def test_profile_logged_in(self):
+        self.client.login(email = self.user.email, password = self.password)
+        url = reverse("user_profile", kwargs={"slug": self.user.username})
+        # Includes the navbar's unread notification count and the site announcements, measured with a cold cache
+        self.assertQueriesDoNotGrow(lambda: self.client.get(url), self.add_activity, budget=5)
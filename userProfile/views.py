@@ -2,10 +2,13 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import DetailView
 from django.views.generic.edit import UpdateView
 
+from django.shortcuts import aget_object_or_404
 from django.urls import reverse
 
 from django.contrib.auth import get_user_model
 
+from base.replicas import read_from_replica
+from notifications.context_processors import aunread_notifications
 from .forms import CustomUserChangeForm
 
 
@@ -15,7 +18,19 @@ class UserProfileView(DetailView):
     login_url = "account_login"
     slug_field = "username"
     
-user_profile = UserProfileView.as_view()
+user_profile = read_from_replica(UserProfileView.as_view())
+
+
+class AsyncUserProfileView(UserProfileView):
+    # UserProfileView for ASGI deployments (see projectCTW/async_urls.py), reading the profile with the async ORM
+    async def get(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        self.object = await aget_object_or_404(self.model, **{self.slug_field: kwargs[self.slug_url_kwarg]})
+        context = self.get_context_data(object=self.object)
+        context.update(await aunread_notifications(request))
+        return self.render_to_response(context)
+
+async_user_profile = read_from_replica(AsyncUserProfileView.as_view())
 
 
 class AccountProfileView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):